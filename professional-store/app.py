@@ -2,9 +2,9 @@
 # JUSTIN E-COMMERCE - Main Application
 # ========================================
 
-from flask import Flask, render_template
-from flask_session import Session
+from flask import Flask, render_template, session
 from config import Config
+import click
 import os
 
 # Create Flask app
@@ -12,14 +12,17 @@ app = Flask(__name__)
 app.config.from_object(Config)
 
 # Initialize extensions
-Session(app)
+from services.sessions import init_sessions
+init_sessions(app)
 
 # Import and initialize database AFTER app is created
 from models import db
+from database.sqlite_profile import init_sqlite_profile
+init_sqlite_profile(app)
 db.init_app(app)
 
 # Import models AFTER db is initialized
-from models import Product, Order, OrderItem, User, Cart
+from models import Product, Order, OrderItem, User, Cart, RelatedProduct
 
 # Import and register blueprints
 from routes import store_bp, cart_bp, checkout_bp
@@ -27,6 +30,29 @@ app.register_blueprint(store_bp)
 app.register_blueprint(cart_bp)
 app.register_blueprint(checkout_bp)
 
+# Import database services
+from database.migrations import ensure_columns, ensure_indexes
+from services.search import init_search_index
+from services import cart_summaries
+from services.typeahead import typeahead_index
+from services.facets import catalog_facets
+from services.write_queue import write_queue
+write_queue.init_app(app)
+from services.email_outbox import outbox_worker
+outbox_worker.init_app(app)
+from services.payments import payment_intents
+payment_intents.init_app(app)
+from services.inventory import reservation_reaper
+reservation_reaper.init_app(app)
+from services.reaper import cart_reaper
+cart_reaper.init_app(app)
+from services.related_products import related_updater
+related_updater.init_app(app)
+from services.metrics import request_metrics
+request_metrics.init_app(app)
+from services.query_audit import query_auditor
+query_auditor.init_app(app)
+
 # Create database tables
 def init_db():
     """Initialize database and create tables"""
@@ -39,11 +65,26 @@ def init_db():
         # Create all tables
         db.create_all()
         
+        # Add columns and indexes missing from databases created by older versions
+        ensure_columns()
+        ensure_indexes()
+        
+        # Create full-text search index (falls back to LIKE search without FTS5)
+        init_search_index()
+        
         # Load sample data if database is empty
         if Product.query.count() == 0:
             print("Loading sample products...")
             load_sample_products()
         
+        # Warm in-memory indexes
+        typeahead_index.build()
+        catalog_facets.build()
+        
+        # Related products are computed in the background on first start
+        if not db.session.query(RelatedProduct.product_id).first():
+            related_updater.mark_all()
+        
         print("Database initialized successfully!")
 
 def load_sample_products():
@@ -595,6 +636,81 @@ def load_sample_products():
     db.session.commit()
     print(f"Loaded {len(sample_products)} sample products across multiple categories!")
 
+# CLI: send due outbox emails now (e.g. from cron when the worker is disabled)
+@app.cli.command('send-emails')
+def send_emails():
+    """Send all due emails in the outbox"""
+    attempted = outbox_worker.drain()
+    print(f"Attempted {attempted} emails ({outbox_worker.sent} sent, {outbox_worker.dead} dead-lettered)")
+
+@app.cli.command('generate-data')
+@click.option('--products', type=int, default=10000, help='Products to add')
+@click.option('--orders', type=int, default=0, help='Orders to add (with items)')
+@click.option('--carts', type=int, default=0, help='Open carts to add')
+@click.option('--seed', type=int, default=42, help='Random seed (same seed + same database = same rows)')
+@click.option('--chunk-size', type=int, default=5000, help='Rows per insert/commit')
+@click.option('--as-of', type=click.DateTime(), default=None, help='Date carts were last active before (default 2026-01-01)')
+def generate_data(products, orders, carts, seed, chunk_size, as_of):
+    """Bulk-load synthetic catalog, carts and orders for scale testing"""
+    from database.generate_data import generate
+    from services import notify_catalog_change
+    print(f"Generating data (seed {seed})...")
+    counts = generate(
+        products=products, orders=orders, carts=carts, seed=seed, chunk_size=chunk_size, as_of=as_of
+    )
+    
+    # Bulk rows bypass the ORM - rebuild in-memory catalog indexes and caches
+    notify_catalog_change(None)
+    print(f"Done: {', '.join(f'{count} {table}' for table, count in counts.items())}")
+
+@app.cli.command('reclaim-reservations')
+def reclaim_reservations():
+    """Return expired cart reservations to stock"""
+    reclaimed = reservation_reaper.run_once()
+    print(f"Reclaimed {reclaimed} expired reservations")
+
+@app.cli.command('reap-carts')
+def reap_carts():
+    """Delete idle carts and expired sessions"""
+    carts, sessions = cart_reaper.run_once()
+    print(f"Reaped {carts} idle carts ({cart_reaper.cart_rows} rows) and {sessions} expired sessions")
+
+@app.cli.command('rebuild-related')
+def rebuild_related():
+    """Recompute related products for the whole catalog"""
+    from services.related_products import rebuild_all
+    count = rebuild_all()
+    print(f"Rebuilt related products for {count} products")
+
+@app.cli.command('build-recommendations')
+@click.option('--top', type=click.IntRange(min=1), default=None, help='Recommendations per product (default RECOMMENDATIONS_PER_PRODUCT)')
+@click.option('--memory-mb', type=click.IntRange(min=1), default=None, help='Co-occurrence memory budget (default RECOMMENDATION_MEMORY_MB)')
+def build_recommendations_command(top, memory_mb):
+    """Rebuild "customers also bought" from all orders (numpy + scipy)"""
+    from services.recommendations import build_recommendations
+    stats = build_recommendations(top=top, memory_mb=memory_mb)
+    print(f"Stored {stats['recommendations']} recommendations for {stats['products']} products "
+          f"in {stats.get('seconds', 0)}s ({stats['passes']} pass(es) over the orders)")
+
+@app.cli.command('shard-stock')
+@click.argument('product_id', type=int)
+@click.option('--shards', type=int, default=None, help='Counter rows (default STOCK_SHARDS)')
+def shard_stock(product_id, shards):
+    """Split a hot product's stock over counter shards"""
+    from services.inventory import shard_product
+    total = shard_product(db.session, product_id, shards)
+    db.session.commit()
+    print(f"Product {product_id}: {total} units spread over {shards or Config.STOCK_SHARDS} shards")
+
+@app.cli.command('unshard-stock')
+@click.argument('product_id', type=int)
+def unshard_stock(product_id):
+    """Move a product's stock back into a single counter"""
+    from services.inventory import unshard_product
+    total = unshard_product(db.session, product_id)
+    db.session.commit()
+    print(f"Product {product_id}: {total} units back in products.stock")
+
 # Error handlers
 @app.errorhandler(404)
 def not_found(error):
@@ -613,16 +729,18 @@ def inject_globals():
     """Inject global variables into all templates"""
     return {
         'store_name': Config.STORE_NAME,
-        'quantum_url': Config.QUANTUM_URL
+        'quantum_url': Config.QUANTUM_URL,
+        # Cached per session (no query without a session), so pages don't need /api/cart/count
+        'cart_count': cart_summaries.get(session.get('session_id'))['count']
     }
 
 # Main entry point
 if __name__ == '__main__':
-    # Initialize database on first run
+    # Initialize database (creates anything missing from existing databases)
     db_path = os.path.join(os.path.dirname(__file__), 'database', 'store.db')
     if not os.path.exists(db_path):
         print("First run detected - initializing database...")
-        init_db()
+    init_db()
     
     print("=" * 50)
     print("🚀 JUSTIN E-COMMERCE Server Starting...")
@@ -25,21 +25,84 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ECHO = False
     
+    # ============ READ REPLICA ============
+    # Optional database for catalog reads, e.g. a read-only URI for the same file:
+    # sqlite:///file:/path/to/store.db?mode=ro&uri=true
+    DATABASE_REPLICA_URL = os.getenv('DATABASE_REPLICA_URL', '')
+    SQLALCHEMY_BINDS = {'replica': DATABASE_REPLICA_URL} if DATABASE_REPLICA_URL else {}
+    READ_YOUR_WRITES_SECONDS = int(os.getenv('READ_YOUR_WRITES_SECONDS', 5))  # Read primary after a write
+    
+    # ============ DATABASE PERFORMANCE ============
+    # SQLite profile applied to every connection (see database/sqlite_profile.py)
+    SQLITE_PROFILE_ENABLED = os.getenv('SQLITE_PROFILE_ENABLED', 'true').lower() == 'true'
+    SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_CACHE_SIZE_KB = int(os.getenv('SQLITE_CACHE_SIZE_KB', 65536))  # 64MB page cache per connection
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', 268435456))  # 256MB memory-mapped I/O
+    
+    # Connection pool (size for the number of worker threads)
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', 10))  # Seconds to wait for a free connection
+    
+    # Group-commit write queue for cart and order writes (see services/write_queue.py)
+    WRITE_COALESCING_ENABLED = os.getenv('WRITE_COALESCING_ENABLED', 'false').lower() == 'true'
+    WRITE_BATCH_SIZE = int(os.getenv('WRITE_BATCH_SIZE', 32))  # Max intents per commit
+    WRITE_BATCH_WAIT_MS = int(os.getenv('WRITE_BATCH_WAIT_MS', 2))  # Time to gather a group
+    WRITE_TIMEOUT_SECONDS = int(os.getenv('WRITE_TIMEOUT_SECONDS', 10))
+    
     # ============ SESSION ============
-    SESSION_TYPE = 'filesystem'
+    # memory (one process), sqlite (shared on one host), redis, or filesystem (Flask-Session)
+    SESSION_TYPE = os.getenv('SESSION_TYPE', 'sqlite')
+    SESSION_SQLITE_PATH = os.getenv('SESSION_SQLITE_PATH', os.path.join(basedir, 'database', 'sessions.db'))
+    SESSION_REDIS_URL = os.getenv('SESSION_REDIS_URL', 'redis://localhost:6379/0')  # local:// = in-process stand-in
+    SESSION_MEMORY_MAX_ENTRIES = 100000
     SESSION_PERMANENT = False
     SESSION_USE_SIGNER = False
     SESSION_KEY_PREFIX = 'justin_ecommerce_'
     SESSION_SERIALIZATION_FORMAT = 'json'  # Fix for Werkzeug 3.1.5
     
+    # ============ ABANDONED CART REAPER ============
+    REAPER_ENABLED = os.getenv('REAPER_ENABLED', 'true').lower() == 'true'
+    CART_IDLE_TTL_SECONDS = int(os.getenv('CART_IDLE_TTL_SECONDS', 7 * 24 * 3600))
+    SESSION_IDLE_TTL_SECONDS = int(os.getenv('SESSION_IDLE_TTL_SECONDS', 7 * 24 * 3600))
+    REAPER_INTERVAL_SECONDS = int(os.getenv('REAPER_INTERVAL_SECONDS', 300))
+    REAPER_BATCH_SIZE = 500  # Sessions per delete transaction
+    
     # ============ STRIPE ============
     STRIPE_PUBLISHABLE_KEY = os.getenv('STRIPE_PUBLISHABLE_KEY', '')
     STRIPE_SECRET_KEY = os.getenv('STRIPE_SECRET_KEY', '')
     STRIPE_CURRENCY = 'usd'
     
+    # ============ PAYMENTS ============
+    PAYMENT_GATEWAY = os.getenv('PAYMENT_GATEWAY', 'stripe')  # stripe | mock
+    PAYMENT_TIMEOUT_SECONDS = float(os.getenv('PAYMENT_TIMEOUT_SECONDS', 10))
+    PAYMENT_POOL_SIZE = int(os.getenv('PAYMENT_POOL_SIZE', 10))
+    PAYMENT_MAX_RETRIES = int(os.getenv('PAYMENT_MAX_RETRIES', 2))
+    
     # ============ EMAIL ============
     SENDGRID_API_KEY = os.getenv('SENDGRID_API_KEY', '')
     FROM_EMAIL = os.getenv('FROM_EMAIL', 'store@justinecommerce.com')
+    # Transport used by the outbox worker: sendgrid, file (writes .eml files) or console
+    EMAIL_TRANSPORT = os.getenv('EMAIL_TRANSPORT', 'sendgrid' if SENDGRID_API_KEY else 'console')
+    EMAIL_FILE_DIR = os.getenv('EMAIL_FILE_DIR', os.path.join(basedir, 'mail_outbox'))
+    
+    # Outbox worker (see services/email_outbox.py)
+    OUTBOX_WORKER_ENABLED = os.getenv('OUTBOX_WORKER_ENABLED', 'true').lower() == 'true'
+    OUTBOX_POLL_SECONDS = 2
+    OUTBOX_BATCH_SIZE = 20
+    OUTBOX_LEASE_SECONDS = 60  # Claimed messages become due again after this
+    OUTBOX_MAX_ATTEMPTS = 8  # Then the message is dead-lettered
+    OUTBOX_BACKOFF_SECONDS = 30  # Doubles on every failed attempt
+    OUTBOX_BACKOFF_MAX_SECONDS = 3600
+    
+    # ============ INVENTORY ============
+    RESERVATIONS_ENABLED = os.getenv('RESERVATIONS_ENABLED', 'true').lower() == 'true'
+    RESERVATION_TTL_SECONDS = int(os.getenv('RESERVATION_TTL_SECONDS', 900))  # Idle carts lose their hold
+    RESERVATION_REAP_INTERVAL_SECONDS = 30
+    RESERVATION_REAP_BATCH_SIZE = 200  # Rows per reclaim transaction
+    STOCK_SHARDS = int(os.getenv('STOCK_SHARDS', 8))  # Counter rows per hot product
     
     # ============ STORE INFO ============
     STORE_NAME = 'JUSTIN E-COMMERCE'
@@ -57,6 +120,46 @@ class Config:
     TAX_RATE = 0.0825  # 8.25% sales tax
     SHIPPING_COST = 999  # $9.99 in cents
     CURRENCY_SYMBOL = '$'
+    
+    # Price ranges for catalog facets: (min, max) in cents, max exclusive (None = no limit)
+    PRICE_BUCKETS = [
+        (0, 2500),
+        (2500, 5000),
+        (5000, 10000),
+        (10000, 25000),
+        (25000, None)
+    ]
+    
+    # ============ CATALOG ============
+    PRODUCTS_PER_PAGE = int(os.getenv('PRODUCTS_PER_PAGE', 24))
+    API_MAX_PAGE_SIZE = 100
+    
+    # ============ RELATED PRODUCTS ============
+    RELATED_PRODUCTS_ENABLED = os.getenv('RELATED_PRODUCTS_ENABLED', 'true').lower() == 'true'
+    RELATED_PRODUCTS_PER_PRODUCT = int(os.getenv('RELATED_PRODUCTS_PER_PRODUCT', 8))  # Stored per product
+    RELATED_REFRESH_SECONDS = 5  # Background refresh after orders and product edits
+    
+    # ============ RECOMMENDATIONS ============
+    # "Customers also bought" batch job (flask build-recommendations, needs numpy and scipy)
+    RECOMMENDATIONS_PER_PRODUCT = int(os.getenv('RECOMMENDATIONS_PER_PRODUCT', 10))
+    RECOMMENDATION_MIN_CO_PURCHASES = int(os.getenv('RECOMMENDATION_MIN_CO_PURCHASES', 2))  # Ignore one-off pairs
+    RECOMMENDATION_CHUNK_ORDERS = int(os.getenv('RECOMMENDATION_CHUNK_ORDERS', 50000))  # Orders read per chunk
+    RECOMMENDATION_MEMORY_MB = int(os.getenv('RECOMMENDATION_MEMORY_MB', 256))  # Co-occurrence matrix budget
+    
+    # ============ METRICS ============
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')  # /metrics requires "Authorization: Bearer <token>" (unset: debug only)
+    METRICS_SERVER_TIMING = os.getenv('METRICS_SERVER_TIMING', 'false').lower() == 'true'  # Always on in debug
+    
+    # ============ QUERY AUDIT ============
+    # off | warn (print N+1s and slow statements) | raise (fail the request - tests and CI)
+    QUERY_AUDIT_MODE = os.getenv('QUERY_AUDIT_MODE', 'off')
+    QUERY_REPEAT_THRESHOLD = int(os.getenv('QUERY_REPEAT_THRESHOLD', 5))  # Same statement this often in one request
+    QUERY_SLOW_MS = int(os.getenv('QUERY_SLOW_MS', 100))
+    
+    # ============ CACHING ============
+    CART_SUMMARY_CACHE_SIZE = int(os.getenv('CART_SUMMARY_CACHE_SIZE', 10000))  # Sessions kept in memory
+    CATALOG_CACHE_SIZE = int(os.getenv('CATALOG_CACHE_SIZE', 256))  # Rendered /store pages kept in memory
 
 # ========================================
 # END OF CONFIGURATION
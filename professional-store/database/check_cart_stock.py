@@ -0,0 +1,75 @@
+# ========================================
+# JUSTIN E-COMMERCE - Cart Stock Check
+# ========================================
+#
+# Regression check for the add-to-cart stock limit, with and without
+# stock reservations: repeated adds must never take a cart line past
+# the product's stock.
+#
+# Usage (from professional-store/):
+#   python -m database.check_cart_stock
+
+import os
+import sys
+import tempfile
+
+STOCK = 5
+ADD = 4
+
+def check_mode(app, reservations):
+    """Add ADD units three times to a product with STOCK units; returns problems"""
+    from config import Config
+    from models import db, Product, Cart
+    
+    Config.RESERVATIONS_ENABLED = reservations
+    label = 'reservations' if reservations else 'no reservations'
+    
+    with app.app_context():
+        product = Product(name=f'Stock Check ({label})', price=1000, category='Test', stock=STOCK)
+        db.session.add(product)
+        db.session.commit()
+        product_id = product.id
+    
+    client = app.test_client()
+    statuses = [
+        client.post('/cart/add', json={'product_id': product_id, 'quantity': ADD}).status_code
+        for _ in range(3)
+    ]
+    
+    with app.app_context():
+        quantity = db.session.query(db.func.sum(Cart.quantity)).filter(Cart.product_id == product_id).scalar() or 0
+    
+    problems = []
+    if statuses != [200, 400, 400]:
+        problems.append(f"{label}: add statuses {statuses}, expected [200, 400, 400]")
+    if quantity > STOCK:
+        problems.append(f"{label}: cart line reached {quantity} units with {STOCK} in stock")
+    return problems
+
+def main():
+    # Throwaway database - must be set before the app reads its config
+    workdir = tempfile.mkdtemp(prefix='cart-stock-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'stock.db')}"
+    os.environ['RELATED_PRODUCTS_ENABLED'] = 'false'
+    
+    from app import app, init_db
+    init_db()
+    
+    failures = check_mode(app, reservations=True) + check_mode(app, reservations=False)
+    
+    print("=" * 50)
+    if failures:
+        print(f"{len(failures)} problem(s):")
+        for failure in failures:
+            print(f"  ✗ {failure}")
+        return 1
+    
+    print("✓ Cart adds never exceed stock (with and without reservations)")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
+
+# ========================================
+# END OF CART STOCK CHECK
+# ========================================
@@ -0,0 +1,150 @@
+# ========================================
+# JUSTIN E-COMMERCE - Query Plan Check
+# ========================================
+#
+# Drives every route against a throwaway database seeded with the
+# sample catalog, runs EXPLAIN QUERY PLAN on each SQL statement the
+# routes issue, and fails on full table scans. The query auditor runs
+# alongside and fails on N+1 patterns (any statement repeated within
+# one request) and slow statements.
+#
+# Usage (from professional-store/):
+#   python -m database.check_query_plans
+
+import os
+import re
+import sys
+import tempfile
+
+# Matches "SCAN products" / "SCAN TABLE products" without "USING ... INDEX"
+FULL_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)$')
+
+def exercise_routes(client):
+    """Request every route once; yields (label, response) per request"""
+    yield 'GET /', client.get('/')
+    for sort in ('featured', 'price_low', 'price_high', 'name'):
+        yield f'GET /store sort={sort}', client.get(f'/store?sort={sort}')
+        yield f'GET /store category sort={sort}', client.get(f'/store?category=Electronics&sort={sort}')
+        yield f'GET /api/products sort={sort}', client.get(f'/api/products?sort={sort}&limit=5')
+    yield 'GET /store search', client.get('/store?search=wireless')
+    yield 'GET /store price', client.get('/store?price=2500-5000')
+    
+    more = client.get('/api/products?limit=5').headers.get('Link', '')
+    match = re.match(r'<([^>]+)>', more)
+    if match:
+        yield 'GET /api/products next page', client.get(match.group(1))
+    
+    yield 'GET /product/<id>', client.get('/product/1')
+    yield 'GET /api/product/<id>', client.get('/api/product/1')
+    yield 'GET /search', client.get('/search?q=wire')
+    yield 'GET /api/suggest', client.get('/api/suggest?q=wire')
+    yield 'GET /api/facets', client.get('/api/facets')
+    
+    yield 'GET /api/cart/count', client.get('/api/cart/count')
+    yield 'POST /cart/add', client.post('/cart/add', json={'product_id': 1, 'quantity': 1})
+    add = client.post('/cart/add', json={'product_id': 2, 'quantity': 1})
+    yield 'POST /cart/add (second item)', add
+    yield 'GET /cart', client.get('/cart')
+    yield 'GET /api/cart/items', client.get('/api/cart/items')
+    
+    cart_item_id = add.get_json()['cart_item']['id']
+    yield 'POST /cart/update', client.post('/cart/update', json={'cart_item_id': cart_item_id, 'quantity': 2})
+    yield 'GET /checkout', client.get('/checkout')
+    
+    order = client.post('/process-order', json={
+        'name': 'Query Plan',
+        'email': 'plans@example.com',
+        'address': '1 Index Way',
+        'city': 'Austin',
+        'state': 'TX',
+        'zip': '78701',
+        'payment_intent_id': 'pi_query_plan_check'
+    })
+    yield 'POST /process-order', order
+    if order.status_code == 200:
+        yield 'GET /confirmation/<order_number>', client.get(f"/confirmation/{order.get_json()['order_number']}")
+    
+    add = client.post('/cart/add', json={'product_id': 3, 'quantity': 1})
+    yield 'POST /cart/add (after order)', add
+    yield 'POST /cart/remove/<id>', client.post(f"/cart/remove/{add.get_json()['cart_item']['id']}")
+    yield 'POST /cart/clear', client.post('/cart/clear')
+
+def main():
+    # Throwaway database - must be set before the app reads its config
+    workdir = tempfile.mkdtemp(prefix='query-plans-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'plans.db')}"
+    os.environ['QUERY_AUDIT_MODE'] = 'warn'
+    os.environ['RELATED_PRODUCTS_ENABLED'] = 'false'  # No background queries mixed into the capture
+    os.environ.setdefault('QUERY_REPEAT_THRESHOLD', '2')
+    
+    from sqlalchemy import event
+    from app import app, init_db
+    from models import db
+    from services.query_audit import query_auditor
+    
+    init_db()
+    
+    # Detail pages read precomputed related products
+    from services.related_products import rebuild_all
+    with app.app_context():
+        rebuild_all()
+    
+    captured = []
+    
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if executemany:
+            parameters = parameters[0] if parameters else ()
+        captured.append((statement, parameters))
+    
+    with app.app_context():
+        engine = db.engine
+    
+    tables = set(db.metadata.tables)
+    failures = []
+    checked = 0
+    client = app.test_client()
+    
+    event.listen(engine, 'before_cursor_execute', capture)
+    try:
+        for label, response in exercise_routes(client):
+            event.remove(engine, 'before_cursor_execute', capture)
+            
+            if response.status_code >= 400:
+                failures.append(f"{label}: HTTP {response.status_code}")
+            
+            with engine.connect() as conn:
+                for statement, parameters in captured:
+                    if not statement.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE', 'WITH')):
+                        continue
+                    checked += 1
+                    plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+                    for row in plan:
+                        detail = row[-1]
+                        match = FULL_SCAN.match(detail)
+                        if match and match.group(1) in tables:
+                            failures.append(f"{label}: {detail}\n    {' '.join(statement.split())}")
+            
+            captured.clear()
+            event.listen(engine, 'before_cursor_execute', capture)
+    finally:
+        event.remove(engine, 'before_cursor_execute', capture)
+    
+    failures.extend(f"{finding}" for finding in query_auditor.findings)
+    
+    print("=" * 50)
+    print(f"Checked {checked} statements")
+    if failures:
+        print(f"{len(failures)} problem(s):")
+        for failure in failures:
+            print(f"  ✗ {failure}")
+        return 1
+    
+    print("✓ No full table scans, N+1 patterns or slow statements")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
+
+# ========================================
+# END OF QUERY PLAN CHECK
+# ========================================
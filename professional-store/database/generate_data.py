@@ -0,0 +1,241 @@
+# ========================================
+# JUSTIN E-COMMERCE - Synthetic Data Generator
+# ========================================
+#
+# Bulk-loads a production-sized catalog, carts and order history for
+# scale testing. Everything is drawn from one seeded RNG, so the same
+# seed on the same starting database produces the same rows.
+#
+# Usage (from professional-store/):
+#   flask --app app generate-data --products 100000 --orders 50000 --carts 20000 --seed 42
+
+import bisect
+import random
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import func, insert
+from config import Config
+from models import db, Product, Order, OrderItem, Cart
+
+# Fixed anchor for catalog and order dates (keeps output reproducible)
+ANCHOR = datetime(2026, 1, 1)
+
+# category: (share of catalog, median price in cents, nouns)
+CATEGORIES = {
+    'Electronics': (0.24, 8999, ['Headphones', 'Speaker', 'Charger', 'Keyboard', 'Monitor', 'Webcam', 'Router', 'Earbuds', 'Tablet Stand', 'SSD']),
+    'Home & Garden': (0.20, 3999, ['Lamp', 'Planter', 'Cookware Set', 'Knife Block', 'Throw Blanket', 'Hose', 'Rug', 'Shelf', 'Candle', 'Tool Kit']),
+    'Clothing': (0.16, 3499, ['T-Shirt', 'Hoodie', 'Jacket', 'Jeans', 'Sneakers', 'Socks', 'Cap', 'Scarf', 'Dress', 'Shorts']),
+    'Sports': (0.12, 4499, ['Yoga Mat', 'Dumbbells', 'Water Bottle', 'Jump Rope', 'Backpack', 'Tent', 'Bike Light', 'Resistance Bands', 'Ball', 'Gloves']),
+    'Beauty': (0.10, 2499, ['Serum', 'Moisturizer', 'Cleanser', 'Lip Balm', 'Hair Oil', 'Face Mask', 'Sunscreen', 'Brush Set', 'Perfume', 'Shampoo']),
+    'Books': (0.10, 1799, ['Novel', 'Cookbook', 'Field Guide', 'Workbook', 'Biography', 'Atlas', 'Journal', 'Anthology', 'Handbook', 'Poetry Collection']),
+    'Accessories': (0.08, 2999, ['Wallet', 'Watch', 'Sunglasses', 'Belt', 'Phone Case', 'Keychain', 'Tote Bag', 'Umbrella', 'Bracelet', 'Lanyard']),
+}
+
+ADJECTIVES = ['Premium', 'Classic', 'Ultra', 'Eco', 'Compact', 'Pro', 'Smart', 'Vintage', 'Essential', 'Deluxe',
+              'Lightweight', 'Wireless', 'Organic', 'Modern', 'Rugged', 'Travel', 'Everyday', 'Signature']
+FIRST_NAMES = ['Alex', 'Sam', 'Jordan', 'Taylor', 'Morgan', 'Casey', 'Riley', 'Jamie', 'Avery', 'Quinn', 'Drew', 'Reese']
+LAST_NAMES = ['Smith', 'Garcia', 'Chen', 'Patel', 'Johnson', 'Nguyen', 'Brown', 'Kim', 'Lopez', 'Miller', 'Davis', 'Wilson']
+CITIES = [('Austin', 'TX'), ('Denver', 'CO'), ('Seattle', 'WA'), ('Boston', 'MA'), ('Atlanta', 'GA'),
+          ('Chicago', 'IL'), ('Phoenix', 'AZ'), ('Portland', 'OR'), ('Miami', 'FL'), ('Columbus', 'OH')]
+ORDER_STATUSES = (['delivered', 'shipped', 'processing', 'cancelled'], [70, 15, 10, 5])
+
+# ============ HELPERS ============
+
+def next_id(model):
+    """First free primary key (rows get explicit ids so no reload is needed)"""
+    return (db.session.query(func.max(model.id)).scalar() or 0) + 1
+
+def insert_rows(model, rows):
+    """Insert a list of rows with one core executemany (no commit)"""
+    if rows:
+        db.session.execute(insert(model.__table__), rows)
+    return len(rows)
+
+def insert_chunks(model, rows, chunk_size):
+    """Insert rows with core executemany, committing every chunk_size rows"""
+    table = model.__table__
+    chunk = []
+    count = 0
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            db.session.execute(insert(table), chunk)
+            db.session.commit()
+            count += len(chunk)
+            chunk = []
+    if chunk:
+        db.session.execute(insert(table), chunk)
+        db.session.commit()
+        count += len(chunk)
+    return count
+
+def popularity(rng, product_ids, exponent=1.1):
+    """Zipf-like popularity: returns (ids in rank order, cumulative weights)"""
+    ranked = list(product_ids)
+    rng.shuffle(ranked)
+    cumulative = []
+    total = 0.0
+    for rank in range(1, len(ranked) + 1):
+        total += 1.0 / rank ** exponent
+        cumulative.append(total)
+    return ranked, cumulative
+
+def pick(rng, ranked, cumulative):
+    """Draw one product id by popularity"""
+    return ranked[bisect.bisect_left(cumulative, rng.random() * cumulative[-1])]
+
+# ============ GENERATORS ============
+
+def product_rows(rng, count, first_id):
+    """Products spread over categories with log-normal prices"""
+    names = list(CATEGORIES)
+    shares = [CATEGORIES[name][0] for name in names]
+    
+    for offset in range(count):
+        category = rng.choices(names, shares)[0]
+        _, median_price, nouns = CATEGORIES[category]
+        noun = rng.choice(nouns)
+        adjective = rng.choice(ADJECTIVES)
+        model = f"{rng.choice('ABCDEFGHJKLMNPRSTUVWXZ')}{rng.randint(100, 9999)}"
+        
+        # Most items are in stock, a few are sold out or nearly so
+        roll = rng.random()
+        stock = 0 if roll < 0.05 else rng.randint(1, 9) if roll < 0.15 else int(rng.expovariate(1 / 80)) + 10
+        
+        yield {
+            'id': first_id + offset,
+            'name': f"{adjective} {noun} {model}",
+            'description': f"{adjective} {noun.lower()} for everyday use. Model {model}.",
+            'price': max(199, int(rng.lognormvariate(0, 0.6) * median_price) // 100 * 100 + 99),
+            'image_url': f"https://picsum.photos/seed/{first_id + offset}/400/400",
+            'category': category,
+            'stock': stock,
+            'featured': rng.random() < 0.02,
+            'active': rng.random() < 0.98,
+            'created_at': ANCHOR - timedelta(minutes=rng.randint(0, 2 * 365 * 24 * 60)),
+            'updated_at': ANCHOR
+        }
+
+def cart_rows(rng, count, first_id, ranked, cumulative, as_of):
+    """Open carts of 1-5 lines; last activity spread over the two weeks before as_of"""
+    for n in range(count):
+        session_id = f"gen-{first_id + n}"
+        updated_at = as_of - timedelta(seconds=int(rng.expovariate(1 / (3 * 24 * 3600))) % (14 * 24 * 3600))
+        product_ids = {pick(rng, ranked, cumulative) for _ in range(rng.randint(1, 5))}
+        for product_id in product_ids:
+            yield {
+                'session_id': session_id,
+                'product_id': product_id,
+                'quantity': rng.choice([1, 1, 1, 2, 2, 3]),
+                'created_at': updated_at - timedelta(minutes=rng.randint(0, 120)),
+                'updated_at': updated_at
+            }
+
+def order_chunks(rng, count, first_id, catalog, ranked, cumulative, chunk_size):
+    """Yield (orders, items) lists of up to chunk_size orders each.
+    
+    A few heavy repeat customers, many one-off buyers.
+    """
+    customers = max(count // 3, 1)
+    orders = []
+    items = []
+    
+    for offset in range(count):
+        order_id = first_id + offset
+        customer = min(int(rng.paretovariate(1.2)) - 1, customers - 1) if rng.random() < 0.4 else rng.randrange(customers)
+        first, last = FIRST_NAMES[customer % len(FIRST_NAMES)], LAST_NAMES[customer // len(FIRST_NAMES) % len(LAST_NAMES)]
+        city, state = CITIES[customer % len(CITIES)]
+        
+        # Item count is geometric: most orders have one or two lines
+        lines = 1
+        while lines < 8 and rng.random() < 0.45:
+            lines += 1
+        
+        subtotal = 0
+        for product_id in {pick(rng, ranked, cumulative) for _ in range(lines)}:
+            name, price = catalog[product_id]
+            quantity = rng.choice([1, 1, 1, 1, 2, 2, 3])
+            subtotal += price * quantity
+            items.append({
+                'order_id': order_id,
+                'product_id': product_id,
+                'product_name': name,
+                'quantity': quantity,
+                'price': price,
+                'subtotal': price * quantity
+            })
+        
+        tax = int(subtotal * Config.TAX_RATE)
+        created_at = ANCHOR - timedelta(minutes=rng.randint(0, 365 * 24 * 60))
+        orders.append({
+            'id': order_id,
+            'order_number': f"GEN-{order_id:010d}",
+            'customer_name': f"{first} {last}",
+            'customer_email': f"customer{customer}@example.com",
+            'customer_phone': f"555-{customer % 10000:04d}",
+            'shipping_address': f"{rng.randint(1, 9999)} Main St",
+            'shipping_city': city,
+            'shipping_state': state,
+            'shipping_zip': f"{rng.randint(10000, 99999)}",
+            'subtotal': subtotal,
+            'tax': tax,
+            'shipping': Config.SHIPPING_COST,
+            'total': subtotal + tax + Config.SHIPPING_COST,
+            'status': rng.choices(*ORDER_STATUSES)[0],
+            'stripe_payment_id': f"pi_gen_{order_id}",
+            'stripe_payment_status': 'succeeded',
+            'created_at': created_at,
+            'updated_at': created_at
+        })
+        
+        if len(orders) >= chunk_size:
+            yield orders, items
+            orders, items = [], []
+    
+    if orders:
+        yield orders, items
+
+# ============ ENTRY POINT ============
+
+def generate(products=10000, orders=0, carts=0, seed=42, chunk_size=5000, as_of=None):
+    """Generate data inside an app context; returns row counts per table.
+    
+    Cart activity is dated before as_of (default ANCHOR); pass a recent
+    time to keep generated carts from being reaped as idle.
+    """
+    rng = random.Random(seed)
+    as_of = as_of or ANCHOR
+    counts = {}
+    started = time.perf_counter()
+    
+    if products:
+        # Core inserts skip ORM events; the FTS triggers still fire
+        counts['products'] = insert_chunks(Product, product_rows(rng, products, next_id(Product)), chunk_size)
+        print(f"  products: {counts['products']} ({time.perf_counter() - started:.1f}s)")
+    
+    if orders or carts:
+        catalog = {pid: (name, price) for pid, name, price in db.session.query(
+            Product.id, Product.name, Product.price
+        ).filter(Product.active == True).order_by(Product.id)}
+        if not catalog:
+            raise ValueError("No active products to build orders and carts from")
+        ranked, cumulative = popularity(rng, sorted(catalog))
+    
+    if carts:
+        counts['cart'] = insert_chunks(Cart, cart_rows(rng, carts, next_id(Cart), ranked, cumulative, as_of), chunk_size)
+        print(f"  cart rows: {counts['cart']} ({time.perf_counter() - started:.1f}s)")
+    
+    if orders:
+        # Each chunk of orders is inserted with its items as soon as it is built
+        counts['orders'] = counts['order_items'] = 0
+        for order_list, item_list in order_chunks(rng, orders, next_id(Order), catalog, ranked, cumulative, chunk_size):
+            counts['orders'] += insert_rows(Order, order_list)
+            counts['order_items'] += insert_rows(OrderItem, item_list)
+            db.session.commit()
+        print(f"  orders: {counts['orders']}, items: {counts['order_items']} ({time.perf_counter() - started:.1f}s)")
+    
+    return counts
+
+# ========================================
+# END OF SYNTHETIC DATA GENERATOR
+# ========================================
@@ -0,0 +1,101 @@
+# ========================================
+# JUSTIN E-COMMERCE - Database Migrations
+# ========================================
+
+from sqlalchemy import func, inspect, text
+from models import db, Cart
+
+def merge_duplicate_cart_rows():
+    """Merge duplicate (session_id, product_id) cart rows into one row.
+    
+    Needed before the unique cart index can be created on databases
+    that were written before it existed.
+    """
+    duplicates = db.session.query(
+        Cart.session_id,
+        Cart.product_id,
+        func.min(Cart.id),
+        func.sum(Cart.quantity)
+    ).group_by(
+        Cart.session_id, Cart.product_id
+    ).having(func.count(Cart.id) > 1).all()
+    
+    for session_id, product_id, keep_id, quantity in duplicates:
+        Cart.query.filter(
+            Cart.session_id == session_id,
+            Cart.product_id == product_id,
+            Cart.id != keep_id
+        ).delete(synchronize_session=False)
+        Cart.query.filter(Cart.id == keep_id).update(
+            {'quantity': quantity}, synchronize_session=False
+        )
+    
+    db.session.commit()
+    return len(duplicates)
+
+def ensure_columns():
+    """Add columns declared on the models that are missing from the database.
+    
+    db.create_all() never alters existing tables. New columns must be
+    nullable or have a server default for this to work.
+    """
+    inspector = inspect(db.engine)
+    added = []
+    
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            
+            column_type = column.type.compile(dialect=db.engine.dialect)
+            db.session.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+            added.append(f'{table.name}.{column.name}')
+    
+    if 'cart.updated_at' in added:
+        # Existing cart rows were last active when they were created
+        Cart.query.filter(Cart.updated_at.is_(None)).update(
+            {'updated_at': Cart.created_at}, synchronize_session=False
+        )
+    
+    db.session.commit()
+    if added:
+        print(f"Added columns: {', '.join(added)}")
+    return added
+
+def ensure_indexes():
+    """Create indexes declared on the models that are missing from the database.
+    
+    db.create_all() only creates indexes together with new tables, so
+    existing databases would otherwise never get them.
+    """
+    inspector = inspect(db.engine)
+    created = []
+    
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing:
+                continue
+            
+            if table.name == Cart.__tablename__ and index.unique:
+                merged = merge_duplicate_cart_rows()
+                if merged:
+                    print(f"Merged {merged} duplicate cart rows")
+            
+            index.create(bind=db.engine)
+            created.append(index.name)
+    
+    if created:
+        print(f"Created indexes: {', '.join(created)}")
+    return created
+
+# ========================================
+# END OF DATABASE MIGRATIONS
+# ========================================
@@ -0,0 +1,77 @@
+# ========================================
+# JUSTIN E-COMMERCE - Read/Write Session Routing
+# ========================================
+
+from contextlib import contextmanager
+import time
+from flask import g, has_request_context, request, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql import Select
+from config import Config
+
+# Bind key of the read replica in SQLALCHEMY_BINDS
+READ_BIND = 'replica'
+
+# Flask session key holding the end of the read-your-writes window
+PRIMARY_UNTIL_KEY = 'db_primary_until'
+
+
+class RoutingSession(Session):
+    """Session that sends SELECTs from read-only routes to the replica bind.
+    
+    Everything else (flushes, UPDATE/DELETE, routes not marked read-only)
+    uses the primary engine.
+    """
+    
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and isinstance(clause, Select) and reading_from_replica():
+            replica = self._db.engines.get(READ_BIND)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def reading_from_replica():
+    """Check if the current request may read from the replica"""
+    return has_request_context() and g.get('db_read_replica', False) and not g.get('db_force_primary', False)
+
+def use_read_replica():
+    """before_request hook for read-only blueprints.
+    
+    Visitors who wrote recently keep reading from the primary so they
+    see their own writes despite replication lag.
+    """
+    if not replica_configured():
+        return
+    
+    primary_until = session.get(PRIMARY_UNTIL_KEY)
+    g.db_read_replica = not (primary_until and primary_until > time.time())
+
+def replica_configured():
+    """Check if a read replica bind is configured"""
+    return bool(Config.SQLALCHEMY_BINDS.get(READ_BIND))
+
+def remember_write(response):
+    """after_request hook for write blueprints - start the read-your-writes window"""
+    # Visitors without a session have nothing to read back
+    if session and replica_configured() and request_wrote(response):
+        session[PRIMARY_UNTIL_KEY] = time.time() + Config.READ_YOUR_WRITES_SECONDS
+    return response
+
+def request_wrote(response):
+    """Check if a response came from a successful write request"""
+    return request.method in ('POST', 'PUT', 'PATCH', 'DELETE') and response.status_code < 400
+
+@contextmanager
+def primary():
+    """Read from the primary inside a read-only route (read-your-writes escape hatch)"""
+    previous = g.get('db_force_primary', False)
+    g.db_force_primary = True
+    try:
+        yield
+    finally:
+        g.db_force_primary = previous
+
+# ========================================
+# END OF READ/WRITE SESSION ROUTING
+# ========================================
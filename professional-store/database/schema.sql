@@ -59,15 +59,71 @@ CREATE TABLE IF NOT EXISTS cart (
     product_id INTEGER NOT NULL,
     quantity INTEGER DEFAULT 1,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE
 );
 
+-- ============ STOCK RESERVATIONS TABLE ============
+CREATE TABLE IF NOT EXISTS stock_reservations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    product_id INTEGER NOT NULL,
+    quantity INTEGER NOT NULL DEFAULT 0,
+    expires_at TIMESTAMP NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE
+);
+
+-- ============ STOCK SHARDS TABLE (hot products) ============
+CREATE TABLE IF NOT EXISTS stock_shards (
+    product_id INTEGER NOT NULL,
+    shard INTEGER NOT NULL,
+    quantity INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (product_id, shard),
+    FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE
+);
+
+-- ============ RELATED PRODUCTS TABLE (precomputed) ============
+CREATE TABLE IF NOT EXISTS related_products (
+    product_id INTEGER NOT NULL,
+    rank INTEGER NOT NULL,
+    related_id INTEGER NOT NULL,
+    score REAL NOT NULL DEFAULT 0,
+    co_purchases INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (product_id, rank),
+    FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE,
+    FOREIGN KEY (related_id) REFERENCES products(id) ON DELETE CASCADE
+);
+
+-- ============ PRODUCT RECOMMENDATIONS TABLE (batch job) ============
+CREATE TABLE IF NOT EXISTS product_recommendations (
+    product_id INTEGER NOT NULL,
+    rank INTEGER NOT NULL,
+    recommended_id INTEGER NOT NULL,
+    score REAL NOT NULL DEFAULT 0,
+    co_purchases INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (product_id, rank),
+    FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE,
+    FOREIGN KEY (recommended_id) REFERENCES products(id) ON DELETE CASCADE
+);
+
 -- ============ INDEXES FOR PERFORMANCE ============
-CREATE INDEX IF NOT EXISTS idx_products_category ON products(category);
-CREATE INDEX IF NOT EXISTS idx_products_active ON products(active);
-CREATE INDEX IF NOT EXISTS idx_orders_email ON orders(customer_email);
-CREATE INDEX IF NOT EXISTS idx_orders_status ON orders(status);
-CREATE INDEX IF NOT EXISTS idx_cart_session ON cart(session_id);
+-- Mirrors the indexes declared on the models (app.py creates them on existing databases)
+CREATE INDEX IF NOT EXISTS idx_products_active_featured_created ON products(active, featured, created_at);
+CREATE INDEX IF NOT EXISTS idx_products_active_price ON products(active, price);
+CREATE INDEX IF NOT EXISTS idx_products_active_name ON products(active, name);
+CREATE INDEX IF NOT EXISTS idx_products_active_category_price ON products(active, category, price);
+CREATE INDEX IF NOT EXISTS ix_orders_customer_email ON orders(customer_email);
+CREATE INDEX IF NOT EXISTS ix_orders_status ON orders(status);
+CREATE INDEX IF NOT EXISTS ix_order_items_order_id ON order_items(order_id);
+CREATE INDEX IF NOT EXISTS ix_order_items_product_id ON order_items(product_id);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_cart_session_product ON cart(session_id, product_id);
+CREATE INDEX IF NOT EXISTS ix_cart_updated_at ON cart(updated_at);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_stock_reservations_session_product ON stock_reservations(session_id, product_id);
+CREATE INDEX IF NOT EXISTS ix_stock_reservations_expires_at ON stock_reservations(expires_at);
+CREATE INDEX IF NOT EXISTS ix_related_products_related_id ON related_products(related_id);
 
 -- ============ SAMPLE PRODUCTS ============
 INSERT INTO products (name, description, price, image_url, category, stock, featured) VALUES
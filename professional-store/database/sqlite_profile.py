@@ -0,0 +1,71 @@
+# ========================================
+# JUSTIN E-COMMERCE - SQLite Performance Profile
+# ========================================
+
+import sqlite3
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from config import Config
+
+def is_file_sqlite(uri):
+    """Check if a database URI points at a SQLite file (not in-memory)"""
+    url = make_url(uri)
+    return url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:')
+
+def engine_options(uri):
+    """Get SQLALCHEMY_ENGINE_OPTIONS for a database URI.
+    
+    SQLite files get a queue pool sized for threaded workers; in-memory
+    SQLite keeps Flask-SQLAlchemy's single shared connection.
+    """
+    if not is_file_sqlite(uri):
+        return {}
+    
+    return {
+        'pool_size': Config.DB_POOL_SIZE,
+        'max_overflow': Config.DB_MAX_OVERFLOW,
+        'pool_timeout': Config.DB_POOL_TIMEOUT,
+        'connect_args': {
+            # Seconds the driver waits on a locked database
+            'timeout': Config.SQLITE_BUSY_TIMEOUT_MS / 1000
+        }
+    }
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply the performance pragmas to each new SQLite connection"""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    
+    cursor = dbapi_connection.cursor()
+    try:
+        # WAL lets readers keep reading while one writer commits
+        # (read-only connections cannot change the journal mode)
+        try:
+            cursor.execute(f"PRAGMA journal_mode={Config.SQLITE_JOURNAL_MODE}")
+        except sqlite3.OperationalError:
+            pass
+        # NORMAL is durable in WAL mode except on power loss; skips most fsyncs
+        cursor.execute(f"PRAGMA synchronous={Config.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={int(Config.SQLITE_BUSY_TIMEOUT_MS)}")
+        # Negative cache_size is in KiB
+        cursor.execute(f"PRAGMA cache_size=-{int(Config.SQLITE_CACHE_SIZE_KB)}")
+        cursor.execute(f"PRAGMA mmap_size={int(Config.SQLITE_MMAP_SIZE)}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cursor.close()
+
+def init_sqlite_profile(app):
+    """Configure engine options and connection pragmas (call before db.init_app)"""
+    if not Config.SQLITE_PROFILE_ENABLED:
+        return
+    
+    options = engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
+    options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+    
+    if not event.contains(Engine, 'connect', apply_sqlite_pragmas):
+        event.listen(Engine, 'connect', apply_sqlite_pragmas)
+
+# ========================================
+# END OF SQLITE PERFORMANCE PROFILE
+# ========================================
@@ -0,0 +1,319 @@
+# ========================================
+# JUSTIN E-COMMERCE - Load Test Harness
+# ========================================
+#
+# Drives the app in-process through its WSGI callable with a pool of
+# virtual shoppers, then reports latency percentiles, throughput and
+# error rates per route. Runs against a throwaway database with the
+# mock payment gateway and file email transport, so nothing leaves
+# the machine.
+#
+# Usage (from professional-store/):
+#   python load_test.py --scenario browse --concurrency 16 --duration 30
+#   python load_test.py --scenario checkout --products 20000 --compare load_results/<earlier run>.json
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+
+# Weighted shopper journeys per scenario
+SCENARIOS = {
+    'browse': {'browse': 85, 'search': 8, 'add_to_cart': 5, 'checkout': 2},
+    'cart': {'browse': 30, 'add_to_cart': 35, 'edit_cart': 25, 'checkout': 10},
+    'checkout': {'browse': 15, 'add_to_cart': 10, 'checkout': 75},
+}
+
+SORTS = ['featured', 'price_low', 'price_high', 'name']
+SEARCH_TERMS = ['wire', 'premium', 'smart', 'lamp', 'yoga', 'classic', 'watch', 'key']
+
+# ============ STATS ============
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)]
+
+
+class RouteStats:
+    """Latencies (ms) and error count for one route, owned by one thread"""
+    
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+        self.statuses = {}
+    
+    def merge(self, other):
+        self.latencies.extend(other.latencies)
+        self.errors += other.errors
+        for status, count in other.statuses.items():
+            self.statuses[status] = self.statuses.get(status, 0) + count
+    
+    def summary(self, elapsed):
+        """Percentiles, throughput and error rate for the report"""
+        values = sorted(self.latencies)
+        count = len(values)
+        return {
+            'requests': count,
+            'rps': round(count / elapsed, 1) if elapsed else 0.0,
+            'errors': self.errors,
+            'error_rate': round(self.errors / count, 4) if count else 0.0,
+            'mean_ms': round(sum(values) / count, 2) if count else 0.0,
+            'p50_ms': round(percentile(values, 50), 2),
+            'p95_ms': round(percentile(values, 95), 2),
+            'p99_ms': round(percentile(values, 99), 2),
+            'max_ms': round(values[-1], 2) if values else 0.0,
+            'statuses': {str(status): n for status, n in sorted(self.statuses.items())}
+        }
+
+# ============ VIRTUAL SHOPPER ============
+
+class Shopper:
+    """One simulated visitor with its own cookie jar"""
+    
+    def __init__(self, app, product_ids, categories, seed):
+        self.client = app.test_client()
+        self.rng = random.Random(seed)
+        self.product_ids = product_ids
+        self.categories = categories
+        self.cart_items = []
+        self.stats = {}
+    
+    def request(self, route, method, path, expect=(200,), **kwargs):
+        """Issue one request through the WSGI app and time it"""
+        started = time.perf_counter()
+        response = getattr(self.client, method)(path, **kwargs)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        
+        stats = self.stats.get(route)
+        if stats is None:
+            stats = self.stats[route] = RouteStats()
+        stats.latencies.append(elapsed_ms)
+        stats.statuses[response.status_code] = stats.statuses.get(response.status_code, 0) + 1
+        if response.status_code not in expect:
+            stats.errors += 1
+        return response
+    
+    def product_id(self):
+        return self.rng.choice(self.product_ids)
+    
+    # ============ JOURNEYS ============
+    
+    def browse(self):
+        """Listing page, maybe a second page, then a product"""
+        params = {'sort': self.rng.choice(SORTS)}
+        if self.rng.random() < 0.5:
+            params['category'] = self.rng.choice(self.categories)
+        self.request('GET /store', 'get', '/store', query_string=params)
+        if self.rng.random() < 0.3:
+            self.request('GET /api/products', 'get', '/api/products', query_string=params)
+        self.request('GET /product/<id>', 'get', f'/product/{self.product_id()}')
+    
+    def search(self):
+        """Typeahead then a full search"""
+        term = self.rng.choice(SEARCH_TERMS)
+        self.request('GET /api/suggest', 'get', '/api/suggest', query_string={'q': term[:3]})
+        self.request('GET /store search', 'get', '/store', query_string={'search': term})
+    
+    def add_to_cart(self):
+        """View a product and add it"""
+        product_id = self.product_id()
+        self.request('GET /product/<id>', 'get', f'/product/{product_id}')
+        response = self.request('POST /cart/add', 'post', '/cart/add', expect=(200,), json={
+            'product_id': product_id,
+            'quantity': self.rng.choice([1, 1, 2])
+        })
+        if response.status_code == 200:
+            self.cart_items.append(response.get_json()['cart_item']['id'])
+    
+    def edit_cart(self):
+        """Open the cart and change or remove a line"""
+        if not self.cart_items:
+            return self.add_to_cart()
+        self.request('GET /cart', 'get', '/cart')
+        cart_item_id = self.rng.choice(self.cart_items)
+        if self.rng.random() < 0.7:
+            self.request('POST /cart/update', 'post', '/cart/update', json={
+                'cart_item_id': cart_item_id,
+                'quantity': self.rng.randint(1, 3)
+            })
+        else:
+            self.request('POST /cart/remove/<id>', 'post', f'/cart/remove/{cart_item_id}')
+            self.cart_items.remove(cart_item_id)
+    
+    def checkout(self):
+        """Fill a cart, pay and place the order"""
+        for _ in range(self.rng.randint(1, 3)):
+            self.add_to_cart()
+        if not self.cart_items:
+            return
+        
+        self.request('GET /checkout', 'get', '/checkout')
+        email = f"load-{id(self)}@example.com"
+        intent = self.request('POST /create-payment-intent', 'post', '/create-payment-intent', json={'email': email})
+        if intent.status_code != 200:
+            return
+        
+        order = self.request('POST /process-order', 'post', '/process-order', json={
+            'name': 'Load Test',
+            'email': email,
+            'address': '1 Load Test Way',
+            'city': 'Austin',
+            'state': 'TX',
+            'zip': '78701',
+            'payment_intent_id': intent.get_json()['clientSecret'].split('_secret_')[0]
+        })
+        if order.status_code == 200:
+            self.cart_items = []
+            self.request('GET /confirmation/<order_number>', 'get', f"/confirmation/{order.get_json()['order_number']}")
+
+# ============ RUNNER ============
+
+def prepare(args):
+    """Point the app at a throwaway database and local stubs, then import it"""
+    workdir = tempfile.mkdtemp(prefix='load-test-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'load.db')}"
+    os.environ['PAYMENT_GATEWAY'] = 'mock'
+    os.environ['EMAIL_TRANSPORT'] = 'file'
+    os.environ['EMAIL_FILE_DIR'] = os.path.join(workdir, 'mail')
+    os.environ['SESSION_SQLITE_PATH'] = os.path.join(workdir, 'sessions.db')
+    
+    from sqlalchemy import update
+    from app import app, init_db
+    from models import db, Product
+    from services import notify_catalog_change
+    
+    init_db()
+    with app.app_context():
+        if args.products:
+            from database.generate_data import generate
+            generate(products=args.products, seed=args.seed)
+        
+        # Plenty of stock so checkout bursts measure the write path, not sell-outs
+        db.session.execute(update(Product).values(stock=10 ** 7))
+        db.session.commit()
+        notify_catalog_change(None)
+        
+        product_ids = [pid for pid, in db.session.query(Product.id).filter(Product.active == True)]
+        categories = sorted({category for category, in db.session.query(Product.category).distinct()})
+    
+    print(f"Database: {os.environ['DATABASE_URL']} ({len(product_ids)} products)")
+    return app, product_ids, categories
+
+def run(app, product_ids, categories, args):
+    """Run the shoppers for the configured time; returns (stats per route, elapsed seconds)"""
+    weights = SCENARIOS[args.scenario]
+    journeys, shares = list(weights), list(weights.values())
+    shoppers = [Shopper(app, product_ids, categories, args.seed + n) for n in range(args.concurrency)]
+    
+    # Warm caches and connections before measuring
+    for shopper in shoppers[:1]:
+        shopper.browse()
+        shopper.stats = {}
+    
+    deadline = time.perf_counter() + args.duration
+    errors = []
+    
+    def drive(shopper):
+        try:
+            while time.perf_counter() < deadline:
+                getattr(shopper, shopper.rng.choices(journeys, shares)[0])()
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {e}")
+    
+    threads = [threading.Thread(target=drive, args=(shopper,), daemon=True) for shopper in shoppers]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    
+    for error in errors[:5]:
+        print(f"  ✗ shopper crashed: {error}")
+    
+    merged = {}
+    for shopper in shoppers:
+        for route, stats in shopper.stats.items():
+            merged.setdefault(route, RouteStats()).merge(stats)
+    return merged, elapsed
+
+def report(results, previous=None):
+    """Print a per-route table (with p95/rps deltas against a previous run)"""
+    header = f"{'route':34} {'reqs':>7} {'rps':>8} {'err%':>6} {'p50':>8} {'p95':>8} {'p99':>8}"
+    print("=" * len(header))
+    print(header)
+    print("-" * len(header))
+    
+    rows = dict(results['routes'], TOTAL=results['total'])
+    for route, row in rows.items():
+        line = (f"{route:34} {row['requests']:>7} {row['rps']:>8.1f} {row['error_rate'] * 100:>5.1f}% "
+                f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f}")
+        before = previous and (previous['total'] if route == 'TOTAL' else previous['routes'].get(route))
+        if before and before['p95_ms'] and before['rps']:
+            line += (f"   p95 {(row['p95_ms'] / before['p95_ms'] - 1) * 100:+.0f}%"
+                     f" rps {(row['rps'] / before['rps'] - 1) * 100:+.0f}%")
+        print(line)
+    print("=" * len(header))
+    print("Latencies in ms")
+
+def main():
+    parser = argparse.ArgumentParser(description='In-process load test for the professional store')
+    parser.add_argument('--scenario', choices=sorted(SCENARIOS), default='browse')
+    parser.add_argument('--concurrency', type=int, default=8, help='Simultaneous shoppers (threads)')
+    parser.add_argument('--duration', type=float, default=20, help='Seconds to run')
+    parser.add_argument('--products', type=int, default=0, help='Add this many synthetic products first')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Results file (default: load_results/<time>-<scenario>.json)')
+    parser.add_argument('--compare', help='Earlier results file to compare against')
+    args = parser.parse_args()
+    
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+    
+    app, product_ids, categories = prepare(args)
+    print(f"Running '{args.scenario}' with {args.concurrency} shoppers for {args.duration:g}s...")
+    stats, elapsed = run(app, product_ids, categories, args)
+    
+    total = RouteStats()
+    for route_stats in stats.values():
+        total.merge(route_stats)
+    
+    results = {
+        'scenario': args.scenario,
+        'concurrency': args.concurrency,
+        'duration_seconds': round(elapsed, 2),
+        'products': len(product_ids),
+        'started_at': datetime.utcnow().isoformat(timespec='seconds'),
+        'routes': {route: stats[route].summary(elapsed) for route in sorted(stats)},
+        'total': total.summary(elapsed)
+    }
+    report(results, previous)
+    
+    output = args.output or os.path.join(
+        basedir, 'load_results', f"{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}-{args.scenario}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved to {output}")
+    
+    return 1 if results['total']['error_rate'] > 0.01 else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
+
+# ========================================
+# END OF LOAD TEST HARNESS
+# ========================================
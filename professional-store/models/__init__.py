@@ -3,14 +3,18 @@
 # ========================================
 
 from flask_sqlalchemy import SQLAlchemy
+from database.routing import RoutingSession
 
-# Create single db instance
-db = SQLAlchemy()
+# Create single db instance (reads from read-only routes may go to a replica bind)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 # Import models (must be after db is created)
 from models.product import Product
 from models.order import Order, OrderItem
 from models.user import User, Cart
+from models.outbox import EmailOutbox
+from models.inventory import StockShard, StockReservation
+from models.related import RelatedProduct, ProductRecommendation
 
 # Export all
 __all__ = [
@@ -19,7 +23,12 @@ __all__ = [
     'Order',
     'OrderItem',
     'User',
-    'Cart'
+    'Cart',
+    'EmailOutbox',
+    'StockShard',
+    'StockReservation',
+    'RelatedProduct',
+    'ProductRecommendation'
 ]
 
 # ========================================
@@ -0,0 +1,57 @@
+# ========================================
+# JUSTIN E-COMMERCE - Inventory Models
+# ========================================
+
+from datetime import datetime
+from models import db
+
+class StockShard(db.Model):
+    """One slice of a hot product's stock.
+    
+    A product with shard rows keeps its sellable stock here instead of
+    in products.stock, so concurrent carts update different rows.
+    products.stock then only mirrors the shard total for display.
+    """
+    
+    __tablename__ = 'stock_shards'
+    
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), primary_key=True)
+    shard = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    quantity = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<StockShard {self.product_id}/{self.shard}: {self.quantity}>'
+
+
+class StockReservation(db.Model):
+    """Stock held for a cart until it checks out or the reservation expires"""
+    
+    __tablename__ = 'stock_reservations'
+    __table_args__ = (
+        # One reservation per product per session (also serves session_id lookups)
+        db.Index('uq_stock_reservations_session_product', 'session_id', 'product_id', unique=True),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    session_id = db.Column(db.String(200), nullable=False)
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False)
+    quantity = db.Column(db.Integer, nullable=False, default=0)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<StockReservation {self.session_id} - Product {self.product_id} x {self.quantity}>'
+    
+    def to_dict(self):
+        """Convert reservation to dictionary"""
+        return {
+            'id': self.id,
+            'session_id': self.session_id,
+            'product_id': self.product_id,
+            'quantity': self.quantity,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None
+        }
+
+# ========================================
+# END OF INVENTORY MODELS
+# ========================================
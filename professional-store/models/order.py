@@ -15,7 +15,7 @@ class Order(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     order_number = db.Column(db.String(20), unique=True, nullable=False)
     customer_name = db.Column(db.String(200), nullable=False)
-    customer_email = db.Column(db.String(200), nullable=False)
+    customer_email = db.Column(db.String(200), nullable=False, index=True)
     customer_phone = db.Column(db.String(20))
     shipping_address = db.Column(db.String(500))
     shipping_city = db.Column(db.String(100))
@@ -25,7 +25,7 @@ class Order(db.Model):
     tax = db.Column(db.Integer, nullable=False)  # In cents
     shipping = db.Column(db.Integer, nullable=False)  # In cents
     total = db.Column(db.Integer, nullable=False)  # In cents
-    status = db.Column(db.String(50), default='pending')
+    status = db.Column(db.String(50), default='pending', index=True)
     stripe_payment_id = db.Column(db.String(200))
     stripe_payment_status = db.Column(db.String(50))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -84,8 +84,8 @@ class OrderItem(db.Model):
     __tablename__ = 'order_items'
     
     id = db.Column(db.Integer, primary_key=True)
-    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False)
-    product_id = db.Column(db.Integer, db.ForeignKey('products.id'))
+    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False, index=True)
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), index=True)
     product_name = db.Column(db.String(200), nullable=False)
     quantity = db.Column(db.Integer, nullable=False)
     price = db.Column(db.Integer, nullable=False)  # Price per item in cents
@@ -0,0 +1,53 @@
+# ========================================
+# JUSTIN E-COMMERCE - Email Outbox Model
+# ========================================
+
+from datetime import datetime
+from models import db
+
+class EmailOutbox(db.Model):
+    """Queued outgoing email, written in the same transaction as its order"""
+    
+    __tablename__ = 'email_outbox'
+    __table_args__ = (
+        # Worker polls for due pending messages
+        db.Index('idx_email_outbox_status_next_attempt', 'status', 'next_attempt_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)  # e.g. 'order_confirmation'
+    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), index=True)
+    recipient = db.Column(db.String(200), nullable=False)
+    subject = db.Column(db.String(300), nullable=False)
+    status = db.Column(db.String(20), default='pending')  # pending, sent, dead
+    attempts = db.Column(db.Integer, default=0)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+    
+    # Relationship to order
+    order = db.relationship('Order')
+    
+    def __repr__(self):
+        return f'<EmailOutbox {self.kind} to {self.recipient} ({self.status})>'
+    
+    def to_dict(self):
+        """Convert outbox message to dictionary"""
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'order_id': self.order_id,
+            'recipient': self.recipient,
+            'subject': self.subject,
+            'status': self.status,
+            'attempts': self.attempts,
+            'next_attempt_at': self.next_attempt_at.isoformat() if self.next_attempt_at else None,
+            'last_error': self.last_error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'sent_at': self.sent_at.isoformat() if self.sent_at else None
+        }
+
+# ========================================
+# END OF EMAIL OUTBOX MODEL
+# ========================================
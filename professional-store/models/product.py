@@ -9,6 +9,15 @@ class Product(db.Model):
     """Product model for store items"""
     
     __tablename__ = 'products'
+    __table_args__ = (
+        # Catalog listing: featured sort, price sorts, name sort, category filter
+        db.Index('idx_products_active_featured_created', 'active', 'featured', 'created_at'),
+        db.Index('idx_products_active_price', 'active', 'price'),
+        db.Index('idx_products_active_name', 'active', 'name'),
+        db.Index('idx_products_active_category_price', 'active', 'category', 'price'),
+    )
+    
+    LOW_STOCK_THRESHOLD = 10  # Below this, product cards show the exact count
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), nullable=False)
@@ -50,6 +59,15 @@ class Product(db.Model):
         """Check if product is in stock"""
         return self.stock > 0
     
+    def is_low_stock(self):
+        """Check if few enough are left to show the exact count"""
+        return 0 < self.stock < self.LOW_STOCK_THRESHOLD
+    
+    @classmethod
+    def shown_stock(cls, stock):
+        """Stock as product cards show it (the exact count only when low)"""
+        return min(stock, cls.LOW_STOCK_THRESHOLD)
+    
     def reduce_stock(self, quantity):
         """Reduce stock by quantity"""
         if self.stock >= quantity:
@@ -0,0 +1,45 @@
+# ========================================
+# JUSTIN E-COMMERCE - Related Products Model
+# ========================================
+
+from datetime import datetime
+from models import db
+
+class RelatedProduct(db.Model):
+    """One precomputed "related items" slot for a product.
+    
+    The primary key (product_id, rank) is the lookup index: a detail page
+    reads its related items in rank order with one range scan.
+    """
+    
+    __tablename__ = 'related_products'
+    
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), primary_key=True)
+    rank = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    related_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False, index=True)
+    score = db.Column(db.Float, nullable=False, default=0.0)
+    co_purchases = db.Column(db.Integer, nullable=False, default=0)  # Orders containing both products
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<RelatedProduct {self.product_id} #{self.rank}: {self.related_id}>'
+
+
+class ProductRecommendation(db.Model):
+    """One "customers also bought" slot, written by the batch recommendation job"""
+    
+    __tablename__ = 'product_recommendations'
+    
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), primary_key=True)
+    rank = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    recommended_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False)
+    score = db.Column(db.Float, nullable=False, default=0.0)  # Cosine similarity of the products' buyers
+    co_purchases = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<ProductRecommendation {self.product_id} #{self.rank}: {self.recommended_id}>'
+
+# ========================================
+# END OF RELATED PRODUCTS MODEL
+# ========================================
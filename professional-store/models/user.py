@@ -36,12 +36,17 @@ class Cart(db.Model):
     """Shopping cart model - session-based"""
     
     __tablename__ = 'cart'
+    __table_args__ = (
+        # One row per product per session (also serves session_id lookups)
+        db.Index('uq_cart_session_product', 'session_id', 'product_id', unique=True),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     session_id = db.Column(db.String(200), nullable=False)
     product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False)
     quantity = db.Column(db.Integer, default=1)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)  # Last cart activity (reaper)
     
     # Relationship to product
     product = db.relationship('Product', backref='cart_items')
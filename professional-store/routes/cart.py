@@ -3,39 +3,85 @@
 # ========================================
 
 from flask import Blueprint, render_template, request, jsonify, session, redirect, url_for
+from database.routing import remember_write
 from models import db, Product, Cart
+from services import cart_summaries
+from services.write_queue import write_queue, WriteRejected, WriteTimeout
+from services.inventory import reserve, reserve_more, release_reservations, available_stock, OutOfStock
+from sqlalchemy import text, bindparam
+from sqlalchemy.orm import joinedload
+from config import Config
 import uuid
+from datetime import datetime
 
 cart_bp = Blueprint('cart', __name__)
 
-def get_session_id():
-    """Get or create session ID for cart"""
+# Writes pin this visitor's reads to the primary for a short window
+cart_bp.after_request(remember_write)
+
+# Add to cart in one statement: selecting from products checks the product
+# exists (and, without reservations, has the stock for the line's new
+# total); the unique (session_id, product_id) index turns a repeat add
+# into an increment
+CART_UPSERT = text("""
+    INSERT INTO cart (session_id, product_id, quantity, created_at, updated_at)
+    SELECT :session_id, products.id, :quantity, :now, :now FROM products
+    WHERE products.id = :product_id AND (NOT :check_stock OR products.stock >= :quantity + COALESCE(
+        (SELECT quantity FROM cart WHERE session_id = :session_id AND product_id = :product_id), 0
+    ))
+    ON CONFLICT (session_id, product_id) DO UPDATE SET
+        quantity = cart.quantity + excluded.quantity,
+        updated_at = excluded.updated_at
+    RETURNING id, quantity
+""").bindparams(bindparam('now', type_=db.DateTime))
+
+# Mark all of a session's lines active; the rows returned are the cart count
+TOUCH_CART = text(
+    "UPDATE cart SET updated_at = :now WHERE session_id = :session_id RETURNING product_id"
+).bindparams(bindparam('now', type_=db.DateTime))
+
+def get_session_id(create=False):
+    """Get session ID for cart (None until the first cart change creates one)"""
     if 'session_id' not in session:
+        if not create:
+            return None
         session['session_id'] = str(uuid.uuid4())
     return session['session_id']
 
+def hold_stock(db_session, session_id, product_id, quantity):
+    """Reserve stock for the cart's new quantity of a product (raises WriteRejected if short)"""
+    if not Config.RESERVATIONS_ENABLED:
+        if available_stock(db_session, product_id) < quantity:
+            raise WriteRejected('Insufficient stock')
+        return
+    
+    try:
+        reserve(db_session, session_id, product_id, quantity)
+    except OutOfStock:
+        raise WriteRejected('Insufficient stock')
+
+def touch_cart(db_session, session_id):
+    """Mark all of the session's cart rows as active (keeps the reaper away); returns their product ids"""
+    return db_session.execute(TOUCH_CART, {'session_id': session_id, 'now': datetime.utcnow()}).all()
+
 @cart_bp.route('/cart')
 def view_cart():
     """View shopping cart"""
     session_id = get_session_id()
     
-    # Get cart items for this session
-    cart_items = Cart.query.filter_by(session_id=session_id).all()
+    # Get cart items for this session (products loaded in the same query)
+    cart_items = Cart.query.options(joinedload(Cart.product)).filter_by(session_id=session_id).all() if session_id else []
     
-    # Calculate totals
-    subtotal = sum(item.get_subtotal() for item in cart_items)
-    tax_rate = 0.0825  # 8.25%
-    tax = int(subtotal * tax_rate)
-    shipping = 999  # $9.99
-    total = subtotal + tax + shipping
+    # Get cached totals
+    summary = cart_summaries.get(session_id)
     
     return render_template(
         'cart.html',
         cart_items=cart_items,
-        subtotal=subtotal,
-        tax=tax,
-        shipping=shipping,
-        total=total
+        subtotal=summary['subtotal'],
+        tax=summary['tax'],
+        shipping=summary['shipping'],
+        total=summary['total']
     )
 
 @cart_bp.route('/cart/add', methods=['POST'])
@@ -48,45 +94,58 @@ def add_to_cart():
     if not product_id:
         return jsonify({'error': 'Product ID required'}), 400
     
-    # Verify product exists
-    product = Product.query.get(product_id)
-    if not product:
-        return jsonify({'error': 'Product not found'}), 404
+    # bool is an int subclass: JSON true would be stored as 1
+    if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity < 1:
+        return jsonify({'error': 'Quantity must be a positive integer'}), 400
     
-    # Check stock
-    if product.stock < quantity:
-        return jsonify({'error': 'Insufficient stock'}), 400
+    # First cart change starts the visitor's session
+    session_id = get_session_id(create=True)
     
-    session_id = get_session_id()
+    def add_item(db_session):
+        """Write intent: add quantity to this session's cart row with one UPSERT"""
+        if Config.RESERVATIONS_ENABLED:
+            # Taking the reservation is the stock check
+            try:
+                reserve_more(db_session, session_id, product_id, quantity)
+            except OutOfStock:
+                raise reject_add(db_session)
+        
+        row = db_session.execute(CART_UPSERT, {
+            'session_id': session_id,
+            'product_id': product_id,
+            'quantity': quantity,
+            'check_stock': not Config.RESERVATIONS_ENABLED,
+            'now': datetime.utcnow()
+        }).first()
+        
+        if row is None:
+            raise reject_add(db_session)
+        
+        # Touch the session's other lines; the rows touched are the new cart count
+        lines = touch_cart(db_session, session_id)
+        return {
+            'cart_item': {'id': row.id, 'product_id': product_id, 'quantity': row.quantity},
+            'cart_count': len(lines)
+        }
+    
+    def reject_add(db_session):
+        """Explain why an add failed (only runs on the failure path)"""
+        if db_session.get(Product, product_id) is None:
+            return WriteRejected('Product not found', 404)
+        return WriteRejected('Insufficient stock')
+    
+    try:
+        added = write_queue.submit(add_item)
+    except (WriteRejected, WriteTimeout) as e:
+        return jsonify({'error': e.message}), e.status
     
-    # Check if item already in cart
-    cart_item = Cart.query.filter_by(
-        session_id=session_id,
-        product_id=product_id
-    ).first()
-    
-    if cart_item:
-        # Update quantity
-        cart_item.quantity += quantity
-    else:
-        # Create new cart item
-        cart_item = Cart(
-            session_id=session_id,
-            product_id=product_id,
-            quantity=quantity
-        )
-        db.session.add(cart_item)
-    
-    db.session.commit()
-    
-    # Get cart count
-    cart_count = Cart.query.filter_by(session_id=session_id).count()
+    cart_summaries.invalidate(session_id)
     
     return jsonify({
         'success': True,
         'message': 'Product added to cart',
-        'cart_count': cart_count,
-        'cart_item': cart_item.to_dict()
+        'cart_count': added['cart_count'],
+        'cart_item': added['cart_item']
     })
 
 @cart_bp.route('/cart/update', methods=['POST'])
@@ -99,52 +158,83 @@ def update_cart():
     if not cart_item_id:
         return jsonify({'error': 'Cart item ID required'}), 400
     
-    session_id = get_session_id()
-    
-    cart_item = Cart.query.filter_by(
-        id=cart_item_id,
-        session_id=session_id
-    ).first()
+    # Zero removes the line
+    if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity < 0:
+        return jsonify({'error': 'Quantity must be a non-negative integer'}), 400
     
-    if not cart_item:
+    session_id = get_session_id()
+    if not session_id:
         return jsonify({'error': 'Cart item not found'}), 404
     
-    # Check stock
-    if cart_item.product.stock < quantity:
-        return jsonify({'error': 'Insufficient stock'}), 400
-    
-    if quantity <= 0:
-        db.session.delete(cart_item)
-    else:
+    def update_item(db_session):
+        """Write intent: set quantity of one of this session's cart rows"""
+        cart_item = db_session.query(Cart).filter_by(
+            id=cart_item_id,
+            session_id=session_id
+        ).first()
+        
+        if not cart_item:
+            raise WriteRejected('Cart item not found', 404)
+        
+        if quantity == 0:
+            release_reservations(db_session, session_id, [cart_item.product_id])
+            db_session.delete(cart_item)
+            return None
+        
+        # Hold stock for the new quantity
+        hold_stock(db_session, session_id, cart_item.product_id, quantity)
+        
         cart_item.quantity = quantity
+        db_session.flush()
+        touch_cart(db_session, session_id)
+        return cart_item.to_dict()
+    
+    try:
+        cart_item = write_queue.submit(update_item)
+    except (WriteRejected, WriteTimeout) as e:
+        return jsonify({'error': e.message}), e.status
     
-    db.session.commit()
+    cart_summaries.invalidate(session_id)
     
     return jsonify({
         'success': True,
         'message': 'Cart updated',
-        'cart_item': cart_item.to_dict() if quantity > 0 else None
+        'cart_count': cart_summaries.get(session_id)['count'],
+        'cart_item': cart_item
     })
 
 @cart_bp.route('/cart/remove/<int:cart_item_id>', methods=['POST', 'DELETE'])
 def remove_from_cart(cart_item_id):
     """Remove item from cart"""
     session_id = get_session_id()
+    if not session_id:
+        return jsonify({'error': 'Cart item not found'}), 404
     
-    cart_item = Cart.query.filter_by(
-        id=cart_item_id,
-        session_id=session_id
-    ).first()
+    def remove_item(db_session):
+        """Write intent: delete one of this session's cart rows"""
+        cart_item = db_session.query(Cart).filter_by(
+            id=cart_item_id,
+            session_id=session_id
+        ).first()
+        
+        if not cart_item:
+            raise WriteRejected('Cart item not found', 404)
+        
+        release_reservations(db_session, session_id, [cart_item.product_id])
+        db_session.delete(cart_item)
+        touch_cart(db_session, session_id)
     
-    if not cart_item:
-        return jsonify({'error': 'Cart item not found'}), 404
+    try:
+        write_queue.submit(remove_item)
+    except (WriteRejected, WriteTimeout) as e:
+        return jsonify({'error': e.message}), e.status
     
-    db.session.delete(cart_item)
-    db.session.commit()
+    cart_summaries.invalidate(session_id)
     
     return jsonify({
         'success': True,
-        'message': 'Item removed from cart'
+        'message': 'Item removed from cart',
+        'cart_count': cart_summaries.get(session_id)['count']
     })
 
 @cart_bp.route('/cart/clear', methods=['POST'])
@@ -152,27 +242,46 @@ def clear_cart():
     """Clear all items from cart"""
     session_id = get_session_id()
     
-    Cart.query.filter_by(session_id=session_id).delete()
-    db.session.commit()
+    def clear_items(db_session):
+        """Write intent: delete all of this session's cart rows"""
+        release_reservations(db_session, session_id)
+        db_session.query(Cart).filter_by(session_id=session_id).delete(synchronize_session=False)
+    
+    # Without a session there is nothing to clear
+    if session_id:
+        try:
+            write_queue.submit(clear_items)
+        except WriteTimeout as e:
+            return jsonify({'error': e.message}), e.status
+        cart_summaries.invalidate(session_id)
     
     return jsonify({
         'success': True,
-        'message': 'Cart cleared'
+        'message': 'Cart cleared',
+        'cart_count': 0
     })
 
 @cart_bp.route('/api/cart/count')
 def cart_count():
-    """Get cart item count"""
+    """Get cart item count (0 without a session)"""
     session_id = get_session_id()
-    count = Cart.query.filter_by(session_id=session_id).count()
+    count = cart_summaries.get(session_id)['count']
     
-    return jsonify({'count': count})
+    # Revalidated on every poll; unchanged counts are answered with 304
+    response = jsonify({'count': count})
+    response.set_etag(f'cart-count-{count}')
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.vary.add('Cookie')
+    return response.make_conditional(request)
 
 @cart_bp.route('/api/cart/items')
 def cart_items_api():
     """Get cart items as JSON"""
     session_id = get_session_id()
-    cart_items = Cart.query.filter_by(session_id=session_id).all()
+    if not session_id:
+        return jsonify([])
+    
+    cart_items = Cart.query.options(joinedload(Cart.product)).filter_by(session_id=session_id).all()
     
     return jsonify([item.to_dict() for item in cart_items])
 
@@ -2,12 +2,24 @@
 # JUSTIN E-COMMERCE - Store Routes
 # ========================================
 
-from flask import Blueprint, render_template, request, jsonify
+from flask import Blueprint, render_template, request, jsonify, url_for
+from markupsafe import Markup
+from config import Config
+from database.routing import use_read_replica
 from models import db, Product
-from sqlalchemy import or_
+from services.pagination import sort_keys, paginate, InvalidCursor
+from services.page_cache import catalog_cache
+from services.facets import catalog_facets, parse_price_range
+from services.search import filter_by_search
+from services.typeahead import typeahead_index
+from services.related_products import get_related_products
+from services.recommendations import get_also_bought
 
 store_bp = Blueprint('store', __name__)
 
+# Catalog reads may be served by the read replica
+store_bp.before_request(use_read_replica)
+
 @store_bp.route('/')
 def landing():
     """Landing page - JUSTIN E-COMMERCE splash screen"""
@@ -20,7 +32,73 @@ def store():
     category = request.args.get('category', None)
     search = request.args.get('search', None)
     sort = request.args.get('sort', 'featured')
+    price_range = request.args.get('price', None)
+    cursor = request.args.get('cursor', None)
+    
+    try:
+        catalog_page = get_catalog_page(category, search, sort, price_range, cursor)
+    except InvalidCursor:
+        # Stale or tampered cursor - start from the first page
+        catalog_page = get_catalog_page(category, search, sort, price_range)
+    
+    return render_template(
+        'store.html',
+        catalog_page=catalog_page,
+        categories=catalog_facets.categories(),
+        price_ranges=catalog_facets.price_ranges(category),
+        selected_category=category,
+        selected_price=price_range,
+        search_query=search,
+        sort_by=sort
+    )
+
+@store_bp.route('/store/more')
+def store_more():
+    """Next page of product cards for "Load More" (JSON)"""
+    category = request.args.get('category', None)
+    search = request.args.get('search', None)
+    sort = request.args.get('sort', 'featured')
+    price_range = request.args.get('price', None)
+    cursor = request.args.get('cursor', None)
+    
+    try:
+        catalog_page = get_catalog_page(category, search, sort, price_range, cursor)
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
     
+    next_url = None
+    if catalog_page['next_cursor']:
+        next_url = url_for(
+            'store.store_more',
+            category=category,
+            search=search,
+            sort=sort,
+            price=price_range,
+            cursor=catalog_page['next_cursor']
+        )
+    
+    return jsonify({
+        'html': str(catalog_page['cards']),
+        'count': catalog_page['count'],
+        'next_url': next_url
+    })
+
+def get_catalog_page(category, search, sort, price_range=None, cursor=None):
+    """Get one rendered catalog page (cached per catalog version)"""
+    cache_key = (category or '', (search or '').lower(), sort, price_range or '', cursor or '')
+    catalog_page = catalog_cache.get(cache_key)
+    if catalog_page is None:
+        version = catalog_cache.version
+        catalog_page = render_catalog_page(category, search, sort, price_range, cursor)
+        catalog_cache.set(cache_key, catalog_page, version)
+    
+    return catalog_page
+
+def filter_catalog(category=None, search=None, price_range=None):
+    """Build the active product query for catalog filters.
+    
+    Returns (query, rank) - rank is the search relevance column or None.
+    """
     # Base query - only active products
     query = Product.query.filter_by(active=True)
     
@@ -28,70 +106,93 @@ def store():
     if category:
         query = query.filter_by(category=category)
     
-    # Search functionality
-    if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            or_(
-                Product.name.ilike(search_term),
-                Product.description.ilike(search_term)
-            )
-        )
+    # Filter by price range facet
+    price_bounds = parse_price_range(price_range) if price_range else None
+    if price_bounds:
+        low, high = price_bounds
+        query = query.filter(Product.price >= low)
+        if high is not None:
+            query = query.filter(Product.price < high)
     
-    # Sorting
-    if sort == 'price_low':
-        query = query.order_by(Product.price.asc())
-    elif sort == 'price_high':
-        query = query.order_by(Product.price.desc())
-    elif sort == 'name':
-        query = query.order_by(Product.name.asc())
-    else:  # featured (default)
-        query = query.order_by(Product.featured.desc(), Product.created_at.desc())
+    # Search functionality (full-text index when available)
+    rank = None
+    if search:
+        query, rank = filter_by_search(query, search)
     
-    products = query.all()
+    return query, rank
+
+def render_catalog_page(category, search, sort, price_range=None, cursor=None):
+    """Query and render one page of product cards"""
+    query, rank = filter_catalog(category, search, price_range)
     
-    # Get all categories for filter
-    categories = db.session.query(Product.category).filter_by(active=True).distinct().all()
-    categories = [cat[0] for cat in categories if cat[0]]
+    # Sorting (featured by default - best match first while searching)
+    keys = sort_keys(sort, rank)
+    products, next_cursor = paginate(query, sort, keys, cursor, Config.PRODUCTS_PER_PAGE)
     
-    return render_template(
-        'store.html',
-        products=products,
-        categories=categories,
-        selected_category=category,
-        search_query=search,
-        sort_by=sort
-    )
+    return {
+        'cards': Markup(render_template('partials/product_cards.html', products=products)),
+        'count': len(products),
+        'next_cursor': next_cursor
+    }
 
 @store_bp.route('/product/<int:product_id>')
 def product_detail(product_id):
     """Product detail page"""
     product = Product.query.get_or_404(product_id)
     
-    # Get related products (same category, excluding current)
-    related_products = Product.query.filter(
-        Product.category == product.category,
-        Product.id != product.id,
-        Product.active == True
-    ).limit(4).all()
+    # Get "customers also bought" from the batch recommendation job
+    also_bought = get_also_bought(product.id, limit=4)
+    
+    # Get precomputed related products (co-purchases and similar items),
+    # without repeating the ones already shown above
+    related_products = get_related_products(
+        product, limit=4, exclude=[item.id for item in also_bought]
+    )
     
     return render_template(
         'product.html',
         product=product,
-        related_products=related_products
+        related_products=related_products,
+        also_bought=also_bought
     )
 
 @store_bp.route('/api/products')
 def api_products():
-    """API endpoint for products (AJAX/JSON)"""
-    products = Product.query.filter_by(active=True).all()
-    return jsonify([product.to_dict() for product in products])
+    """API endpoint for products (AJAX/JSON) - one keyset page at a time.
+    
+    The next page URL is sent in a Link header (rel="next").
+    """
+    sort = request.args.get('sort', 'featured')
+    cursor = request.args.get('cursor', None)
+    limit = request.args.get('limit', Config.PRODUCTS_PER_PAGE, type=int)
+    limit = max(1, min(limit, Config.API_MAX_PAGE_SIZE))
+    
+    query, rank = filter_catalog(
+        category=request.args.get('category', None),
+        search=request.args.get('search', None)
+    )
+    
+    try:
+        products, next_cursor = paginate(query, sort, sort_keys(sort, rank), cursor, limit)
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
+    
+    response = jsonify([product.to_dict() for product in products])
+    if next_cursor:
+        next_args = dict(request.args.items(), cursor=next_cursor)
+        response.headers['Link'] = f'<{url_for("store.api_products", **next_args)}>; rel="next"'
+    return response
 
 @store_bp.route('/api/product/<int:product_id>')
 def api_product(product_id):
     """API endpoint for single product"""
     product = Product.query.get_or_404(product_id)
-    return jsonify(product.to_dict())
+    data = product.to_dict()
+    data['also_bought'] = [
+        {'id': item.id, 'name': item.name, 'price': item.price, 'price_formatted': item.get_price_formatted()}
+        for item in get_also_bought(product.id, limit=Config.RECOMMENDATIONS_PER_PRODUCT)
+    ]
+    return jsonify(data)
 
 @store_bp.route('/search')
 def search():
@@ -101,18 +202,28 @@ def search():
     if not query:
         return jsonify([])
     
-    search_term = f"%{query}%"
-    products = Product.query.filter(
-        Product.active == True,
-        or_(
-            Product.name.ilike(search_term),
-            Product.description.ilike(search_term),
-            Product.category.ilike(search_term)
-        )
-    ).limit(10).all()
+    products, rank = filter_by_search(Product.query.filter(Product.active == True), query)
+    if rank is not None:
+        products = products.order_by(rank)
+    products = products.limit(10).all()
     
     return jsonify([product.to_dict() for product in products])
 
+@store_bp.route('/api/facets')
+def api_facets():
+    """Category and price range facet counts (from memory, no query)"""
+    category = request.args.get('category', None)
+    return jsonify({
+        'categories': catalog_facets.categories(),
+        'price_ranges': catalog_facets.price_ranges(category)
+    })
+
+@store_bp.route('/api/suggest')
+def suggest():
+    """Typeahead suggestions (id, name, price) from the in-memory index"""
+    query = request.args.get('q', '')
+    return jsonify(typeahead_index.suggest(query))
+
 # ========================================
 # END OF STORE ROUTES
 # ========================================
\ No newline at end of file
@@ -0,0 +1,24 @@
+# ========================================
+# JUSTIN E-COMMERCE - Services Package
+# ========================================
+
+from services.catalog_events import on_catalog_change, notify_catalog_change
+from services.cart_summary import cart_summaries, summarize_cart_items
+from services.typeahead import typeahead_index
+from services.page_cache import catalog_cache
+from services.facets import catalog_facets
+
+# Export all
+__all__ = [
+    'on_catalog_change',
+    'notify_catalog_change',
+    'cart_summaries',
+    'summarize_cart_items',
+    'typeahead_index',
+    'catalog_cache',
+    'catalog_facets'
+]
+
+# ========================================
+# END OF SERVICES INIT
+# ========================================
@@ -0,0 +1,66 @@
+# ========================================
+# JUSTIN E-COMMERCE - Background Workers
+# ========================================
+
+from abc import ABC, abstractmethod
+import threading
+from models import db
+
+class BackgroundWorker(ABC):
+    """Daemon thread started with the first request, calling run_once() periodically.
+    
+    Subclasses set name, enabled_setting and interval(), and implement
+    run_once(). Each run gets its own app context; a failed run is rolled
+    back and logged inside that context so the thread keeps going.
+    """
+    
+    name = 'background-worker'
+    enabled_setting = None  # App config flag that turns the worker off
+    
+    def __init__(self):
+        self.app = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+    
+    def init_app(self, app):
+        """Start the worker with the first request"""
+        self.app = app
+        if self.enabled_setting is None or app.config.get(self.enabled_setting, True):
+            app.before_request(self.ensure_started)
+    
+    def ensure_started(self):
+        """Start the worker thread if it is not running"""
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                    self._thread.start()
+    
+    def wake(self):
+        """Run now instead of at the end of the interval"""
+        self._wake.set()
+    
+    @abstractmethod
+    def interval(self):
+        """Seconds between runs"""
+    
+    @abstractmethod
+    def run_once(self):
+        """One unit of work (inside app context)"""
+    
+    def _run(self):
+        """Worker loop"""
+        while True:
+            self._wake.wait(self.interval())
+            self._wake.clear()
+            with self.app.app_context():
+                try:
+                    self.run_once()
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"{self.name} error: {str(e)}")
+
+# ========================================
+# END OF BACKGROUND WORKERS
+# ========================================
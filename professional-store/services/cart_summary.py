@@ -0,0 +1,119 @@
+# ========================================
+# JUSTIN E-COMMERCE - Cart Summary Service
+# ========================================
+
+from collections import OrderedDict
+import hashlib
+from sqlalchemy import func
+import threading
+from config import Config
+from models import db, Product, Cart
+from services.catalog_events import on_catalog_change
+
+def cart_fingerprint(lines):
+    """Hash of cart contents - changes whenever a product, quantity or price changes"""
+    content = ';'.join(f"{product_id}:{quantity}:{price}" for product_id, quantity, price in sorted(lines))
+    return hashlib.sha256(content.encode()).hexdigest()[:32]
+
+def build_summary(lines):
+    """Build cart summary (count, fingerprint and totals in cents) from
+    (product_id, quantity, price) cart lines"""
+    subtotal = sum(quantity * price for product_id, quantity, price in lines)
+    tax = int(subtotal * Config.TAX_RATE)
+    shipping = Config.SHIPPING_COST
+    return {
+        'count': len(lines),
+        'fingerprint': cart_fingerprint(lines),
+        'subtotal': subtotal,
+        'tax': tax,
+        'shipping': shipping,
+        'total': subtotal + tax + shipping
+    }
+
+def summarize_cart_items(cart_items):
+    """Build cart summary from already loaded cart items"""
+    return build_summary([
+        (item.product_id, item.quantity, item.product.price if item.product else 0)
+        for item in cart_items
+    ])
+
+def compute_cart_summary(session_id):
+    """Compute cart summary for a session with a single query"""
+    lines = db.session.query(
+        Cart.product_id,
+        Cart.quantity,
+        func.coalesce(Product.price, 0)
+    ).outerjoin(
+        Product, Cart.product_id == Product.id
+    ).filter(
+        Cart.session_id == session_id
+    ).all()
+    return build_summary([tuple(line) for line in lines])
+
+
+class CartSummaryCache:
+    """LRU cache of cart summaries per session.
+    
+    Entries are write-through invalidated by the cart and checkout
+    routes whenever they change a session's cart. For display only:
+    payment intents are priced with compute_cart_summary().
+    """
+    
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on every invalidation so a summary computed before
+        # a concurrent cart change is never stored
+        self._generation = 0
+    
+    def get(self, session_id):
+        """Get cart summary for a session (computed on cache miss)"""
+        if not session_id:
+            return build_summary([])
+        
+        with self._lock:
+            summary = self._entries.get(session_id)
+            if summary is not None:
+                self._entries.move_to_end(session_id)
+                return summary
+            generation = self._generation
+        
+        summary = compute_cart_summary(session_id)
+        
+        with self._lock:
+            if generation == self._generation:
+                self._entries[session_id] = summary
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        
+        return summary
+    
+    def invalidate(self, session_id):
+        """Drop cached summary after the session's cart changed"""
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(session_id, None)
+    
+    def clear(self):
+        """Drop all cached summaries"""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+
+# Shared cache instance
+cart_summaries = CartSummaryCache(max_entries=Config.CART_SUMMARY_CACHE_SIZE)
+
+@on_catalog_change
+def _clear_on_price_change(changes):
+    """Cached subtotals depend on product prices"""
+    if changes is None or any(
+        change.action == 'delete' or 'price' in change.changed
+        for change in changes
+    ):
+        cart_summaries.clear()
+
+# ========================================
+# END OF CART SUMMARY SERVICE
+# ========================================
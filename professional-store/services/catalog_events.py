@@ -0,0 +1,93 @@
+# ========================================
+# JUSTIN E-COMMERCE - Catalog Change Events
+# ========================================
+
+from collections import namedtuple
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from models import Product
+
+# One product change published after commit
+# action: 'insert', 'update' or 'delete'
+# data: snapshot of the product after the change (None for deletes)
+# changed: names of the columns that changed
+# previous: values of the changed columns before the change (updates and deletes; may be None)
+ProductChange = namedtuple('ProductChange', ['action', 'product_id', 'data', 'changed', 'previous'], defaults=(None,))
+
+SNAPSHOT_FIELDS = ('name', 'price', 'category', 'stock', 'featured', 'active', 'created_at')
+
+_listeners = []
+
+def on_catalog_change(listener):
+    """Register a listener called with a list of ProductChange after each commit.
+    
+    Listeners receive None when the whole catalog may have changed
+    (bulk loads, raw SQL) and should rebuild from the database.
+    """
+    _listeners.append(listener)
+    return listener
+
+def notify_catalog_change(changes=None):
+    """Publish product changes to every registered listener"""
+    for listener in list(_listeners):
+        try:
+            listener(changes)
+        except Exception as e:
+            print(f"Catalog listener {listener.__name__} failed: {str(e)}")
+
+def record_product_changes(session, changes):
+    """Queue changes made with core statements (which skip ORM events) for publishing on commit"""
+    session.info.setdefault('catalog_changes', []).extend(changes)
+
+def _snapshot(product):
+    """Copy the product columns listeners care about"""
+    return {field: getattr(product, field) for field in SNAPSHOT_FIELDS}
+
+def _previous_values(product):
+    """Get the pre-flush values of changed snapshot columns"""
+    previous = {}
+    for attr in inspect(product).attrs:
+        if attr.key in SNAPSHOT_FIELDS and attr.history.deleted:
+            previous[attr.key] = attr.history.deleted[0]
+    return previous
+
+def _changed_columns(product):
+    """Get names of columns with pending changes"""
+    return frozenset(
+        attr.key for attr in inspect(product).attrs
+        if attr.history.has_changes()
+    )
+
+@event.listens_for(Session, 'after_flush')
+def _collect_product_changes(session, flush_context):
+    """Remember product rows written by this flush until the commit"""
+    changes = session.info.setdefault('catalog_changes', [])
+    
+    for obj in session.new:
+        if isinstance(obj, Product):
+            changes.append(ProductChange('insert', obj.id, _snapshot(obj), frozenset(SNAPSHOT_FIELDS)))
+    
+    for obj in session.dirty:
+        if isinstance(obj, Product) and session.is_modified(obj, include_collections=False):
+            changes.append(ProductChange('update', obj.id, _snapshot(obj), _changed_columns(obj), _previous_values(obj)))
+    
+    for obj in session.deleted:
+        if isinstance(obj, Product):
+            changes.append(ProductChange('delete', obj.id, None, frozenset(SNAPSHOT_FIELDS), _snapshot(obj)))
+
+@event.listens_for(Session, 'after_commit')
+def _publish_product_changes(session):
+    """Publish collected product changes once they are durable"""
+    changes = session.info.pop('catalog_changes', None)
+    if changes:
+        notify_catalog_change(changes)
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_product_changes(session, previous_transaction):
+    """Drop collected product changes when the transaction rolls back"""
+    if previous_transaction.parent is None:
+        session.info.pop('catalog_changes', None)
+
+# ========================================
+# END OF CATALOG CHANGE EVENTS
+# ========================================
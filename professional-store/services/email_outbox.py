@@ -0,0 +1,245 @@
+# ========================================
+# JUSTIN E-COMMERCE - Email Outbox
+# ========================================
+
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+import os
+from config import Config
+from models import db, EmailOutbox, Order
+from services.background import BackgroundWorker
+
+# ============ EMAIL CONTENT ============
+
+def order_confirmation_subject(order):
+    """Subject line for an order confirmation"""
+    return f'Order Confirmation - {order.order_number}'
+
+def build_order_confirmation_html(order):
+    """Build order confirmation email HTML"""
+    return f"""
+    <html>
+    <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
+        <div style="background: linear-gradient(135deg, #1e3a5f, #4a90e2); padding: 30px; text-align: center;">
+            <h1 style="color: white; margin: 0;">JUSTIN E-COMMERCE</h1>
+            <p style="color: #c0c5ce; margin: 10px 0 0 0;">Order Confirmation</p>
+        </div>
+        
+        <div style="padding: 30px; background: #f5f5f5;">
+            <h2>Thank you for your order!</h2>
+            <p>Hi {order.customer_name},</p>
+            <p>Your order has been confirmed and is being processed.</p>
+            
+            <div style="background: white; padding: 20px; border-radius: 10px; margin: 20px 0;">
+                <h3>Order Details</h3>
+                <p><strong>Order Number:</strong> {order.order_number}</p>
+                <p><strong>Order Date:</strong> {order.created_at.strftime('%B %d, %Y')}</p>
+                <p><strong>Total:</strong> ${order.total / 100:.2f}</p>
+            </div>
+            
+            <div style="background: white; padding: 20px; border-radius: 10px; margin: 20px 0;">
+                <h3>Shipping Address</h3>
+                <p>{order.get_full_address()}</p>
+            </div>
+            
+            <div style="background: white; padding: 20px; border-radius: 10px; margin: 20px 0;">
+                <h3>Order Items</h3>
+                {''.join([f'<p>{item.product_name} x {item.quantity} - ${item.subtotal / 100:.2f}</p>' for item in order.items])}
+            </div>
+            
+            <p style="margin-top: 30px;">We'll send you another email when your order ships.</p>
+            
+            <p style="color: #666; font-size: 12px; margin-top: 40px;">
+                Questions? Contact us at {Config.FROM_EMAIL}
+            </p>
+        </div>
+    </body>
+    </html>
+    """
+
+def queue_order_confirmation(db_session, order):
+    """Add an order confirmation to the outbox (in the order's transaction)"""
+    message = EmailOutbox(
+        kind='order_confirmation',
+        order_id=order.id,
+        recipient=order.customer_email,
+        subject=order_confirmation_subject(order)
+    )
+    db_session.add(message)
+    return message
+
+def render_message(message):
+    """Build the HTML body for an outbox message"""
+    if message.kind == 'order_confirmation':
+        return build_order_confirmation_html(message.order)
+    raise ValueError(f"Unknown email kind: {message.kind}")
+
+# ============ TRANSPORTS ============
+
+class SendGridTransport:
+    """Send email through the SendGrid API"""
+    
+    def __init__(self, api_key):
+        from sendgrid import SendGridAPIClient
+        self.client = SendGridAPIClient(api_key)
+    
+    def send(self, recipient, subject, html_content):
+        from sendgrid.helpers.mail import Mail
+        message = Mail(
+            from_email=Config.FROM_EMAIL,
+            to_emails=recipient,
+            subject=subject,
+            html_content=html_content
+        )
+        response = self.client.send(message)
+        if response.status_code >= 300:
+            raise RuntimeError(f"SendGrid returned HTTP {response.status_code}")
+
+
+class FileTransport:
+    """Write each email as a .eml file (local development and tests)"""
+    
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+    
+    def send(self, recipient, subject, html_content):
+        message = EmailMessage()
+        message['From'] = Config.FROM_EMAIL
+        message['To'] = recipient
+        message['Subject'] = subject
+        message.set_content(html_content, subtype='html')
+        
+        filename = f"{datetime.utcnow().strftime('%Y%m%d-%H%M%S-%f')}.eml"
+        with open(os.path.join(self.directory, filename), 'wb') as f:
+            f.write(bytes(message))
+
+
+class ConsoleTransport:
+    """Print emails instead of sending them (no email provider configured)"""
+    
+    def send(self, recipient, subject, html_content):
+        print(f"Email to {recipient}: {subject} (not sent - no email transport configured)")
+
+
+def create_transport(name):
+    """Create the transport named by Config.EMAIL_TRANSPORT"""
+    if name == 'sendgrid':
+        return SendGridTransport(Config.SENDGRID_API_KEY)
+    if name == 'file':
+        return FileTransport(Config.EMAIL_FILE_DIR)
+    if name == 'console':
+        return ConsoleTransport()
+    raise ValueError(f"Unknown email transport: {name}")
+
+# ============ WORKER ============
+
+class OutboxWorker(BackgroundWorker):
+    """Background thread draining the email outbox in batches.
+    
+    A failed send is retried with exponential backoff; after
+    OUTBOX_MAX_ATTEMPTS the message is dead-lettered (status 'dead').
+    """
+    
+    name = 'email-outbox-worker'
+    enabled_setting = 'OUTBOX_WORKER_ENABLED'
+    
+    def __init__(self):
+        super().__init__()
+        self.transport = None
+        self.sent = 0
+        self.failed = 0
+        self.dead = 0
+    
+    def init_app(self, app):
+        """Create the transport and start the worker with the first request"""
+        self.transport = create_transport(app.config['EMAIL_TRANSPORT'])
+        super().init_app(app)
+    
+    def interval(self):
+        return Config.OUTBOX_POLL_SECONDS
+    
+    def run_once(self):
+        """Send everything currently due"""
+        return self.drain()
+    
+    def _claim_batch(self):
+        """Claim up to one batch of due messages.
+        
+        Claiming pushes next_attempt_at forward by a lease, so another
+        worker skips them and a crashed worker's messages become due again.
+        """
+        now = datetime.utcnow()
+        due = db.session.query(EmailOutbox.id, EmailOutbox.next_attempt_at).filter(
+            EmailOutbox.status == 'pending',
+            EmailOutbox.next_attempt_at <= now
+        ).order_by(EmailOutbox.next_attempt_at).limit(Config.OUTBOX_BATCH_SIZE).all()
+        
+        lease_until = now + timedelta(seconds=Config.OUTBOX_LEASE_SECONDS)
+        claimed = []
+        for message_id, next_attempt_at in due:
+            updated = EmailOutbox.query.filter(
+                EmailOutbox.id == message_id,
+                EmailOutbox.status == 'pending',
+                EmailOutbox.next_attempt_at == next_attempt_at
+            ).update({'next_attempt_at': lease_until}, synchronize_session=False)
+            if updated:
+                claimed.append(message_id)
+        
+        db.session.commit()
+        return claimed
+    
+    def drain_batch(self):
+        """Send one batch of due messages; returns the number attempted"""
+        claimed = self._claim_batch()
+        if not claimed:
+            return 0
+        
+        messages = EmailOutbox.query.filter(EmailOutbox.id.in_(claimed)).all()
+        for message in messages:
+            try:
+                self.transport.send(message.recipient, message.subject, render_message(message))
+                message.status = 'sent'
+                message.sent_at = datetime.utcnow()
+                message.last_error = None
+                self.sent += 1
+            except Exception as e:
+                self._record_failure(message, e)
+        
+        db.session.commit()
+        return len(claimed)
+    
+    def _record_failure(self, message, error):
+        """Schedule a retry with exponential backoff, or dead-letter the message"""
+        message.attempts = (message.attempts or 0) + 1
+        message.last_error = str(error)
+        self.failed += 1
+        
+        if message.attempts >= Config.OUTBOX_MAX_ATTEMPTS:
+            message.status = 'dead'
+            self.dead += 1
+            print(f"Email {message.id} to {message.recipient} dead-lettered: {str(error)}")
+            return
+        
+        delay = min(
+            Config.OUTBOX_BACKOFF_SECONDS * (2 ** (message.attempts - 1)),
+            Config.OUTBOX_BACKOFF_MAX_SECONDS
+        )
+        message.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+    
+    def drain(self):
+        """Send everything currently due (inside app context); returns messages attempted"""
+        total = 0
+        while True:
+            attempted = self.drain_batch()
+            total += attempted
+            if attempted < Config.OUTBOX_BATCH_SIZE:
+                return total
+
+
+# Shared worker instance
+outbox_worker = OutboxWorker()
+
+# ========================================
+# END OF EMAIL OUTBOX
+# ========================================
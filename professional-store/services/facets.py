@@ -0,0 +1,150 @@
+# ========================================
+# JUSTIN E-COMMERCE - Catalog Facets
+# ========================================
+
+from collections import Counter
+import threading
+from config import Config
+from models import db, Product
+from services.catalog_events import on_catalog_change
+
+def price_bucket(price):
+    """Get index of the PRICE_BUCKETS range containing price (in cents)"""
+    for index, (low, high) in enumerate(Config.PRICE_BUCKETS):
+        if price >= low and (high is None or price < high):
+            return index
+    return None
+
+def price_range_label(low, high):
+    """Format a price bucket for display (e.g. '$25 - $50')"""
+    symbol = Config.CURRENCY_SYMBOL
+    if high is None:
+        return f"{symbol}{low // 100} & Up"
+    if low == 0:
+        return f"Under {symbol}{high // 100}"
+    return f"{symbol}{low // 100} - {symbol}{high // 100}"
+
+def price_range_key(low, high):
+    """Query string value for a price bucket (e.g. '2500-5000')"""
+    return f"{low}-{high if high is not None else ''}"
+
+def parse_price_range(value):
+    """Parse a price_range_key() value into (low, high) cents, or None"""
+    for low, high in Config.PRICE_BUCKETS:
+        if price_range_key(low, high) == value:
+            return low, high
+    return None
+
+
+class CatalogFacets:
+    """Active product counts per category and price range.
+    
+    Built once with a single scan of active products, then updated
+    incrementally from committed product changes.
+    """
+    
+    def __init__(self):
+        self._products = {}          # product_id -> (category, bucket)
+        self._counts = Counter()     # (category, bucket) -> active products
+        self._lock = threading.RLock()
+        self._built = False
+    
+    def build(self):
+        """(Re)build facet counts from active products"""
+        rows = db.session.query(
+            Product.id, Product.category, Product.price
+        ).filter(Product.active == True).all()
+        
+        products = {
+            product_id: (category, price_bucket(price))
+            for product_id, category, price in rows
+        }
+        
+        with self._lock:
+            self._products = products
+            self._counts = Counter(products.values())
+            self._built = True
+    
+    def ensure_built(self):
+        """Build facets on first use"""
+        if not self._built:
+            with self._lock:
+                if not self._built:
+                    self.build()
+    
+    def categories(self):
+        """Get [{'name', 'count'}] for categories with active products"""
+        self.ensure_built()
+        
+        totals = Counter()
+        with self._lock:
+            for (category, bucket), count in self._counts.items():
+                if category and count:
+                    totals[category] += count
+        
+        return [{'name': name, 'count': totals[name]} for name in sorted(totals)]
+    
+    def price_ranges(self, category=None):
+        """Get [{'key', 'label', 'min', 'max', 'count'}] for each price bucket.
+        
+        An empty category (?category=) means all categories, as in the catalog filter.
+        """
+        self.ensure_built()
+        category = category or None
+        
+        totals = Counter()
+        with self._lock:
+            for (product_category, bucket), count in self._counts.items():
+                if category is None or product_category == category:
+                    totals[bucket] += count
+        
+        return [
+            {
+                'key': price_range_key(low, high),
+                'label': price_range_label(low, high),
+                'min': low,
+                'max': high,
+                'count': totals[index]
+            }
+            for index, (low, high) in enumerate(Config.PRICE_BUCKETS)
+        ]
+    
+    def _remove(self, product_id):
+        facet = self._products.pop(product_id, None)
+        if facet is not None:
+            self._counts[facet] -= 1
+            if not self._counts[facet]:
+                del self._counts[facet]
+    
+    def apply_changes(self, changes):
+        """Apply committed product changes incrementally"""
+        with self._lock:
+            if not self._built:
+                return
+            
+            if changes is None:
+                self._built = False
+                return
+            
+            for change in changes:
+                if not change.changed & {'category', 'price', 'active'}:
+                    continue
+                
+                self._remove(change.product_id)
+                if change.action != 'delete' and change.data['active']:
+                    facet = (change.data['category'], price_bucket(change.data['price']))
+                    self._products[change.product_id] = facet
+                    self._counts[facet] += 1
+
+
+# Shared facets instance
+catalog_facets = CatalogFacets()
+
+@on_catalog_change
+def _update_facets(changes):
+    """Keep facet counts in sync with the catalog"""
+    catalog_facets.apply_changes(changes)
+
+# ========================================
+# END OF CATALOG FACETS
+# ========================================
@@ -0,0 +1,428 @@
+# ========================================
+# JUSTIN E-COMMERCE - Inventory
+# ========================================
+
+import itertools
+from collections import defaultdict
+from datetime import datetime, timedelta
+from sqlalchemy import update, delete, case, func, select, text, bindparam
+from models import db, Product, StockShard, StockReservation
+from config import Config
+from services.background import BackgroundWorker
+from services.catalog_events import ProductChange, SNAPSHOT_FIELDS, record_product_changes
+
+# Stock model:
+#   - products.stock is the unreserved stock of ordinary products
+#   - hot products keep their unreserved stock in stock_shards rows
+#     (products.stock only mirrors the shard total for display)
+#   - adding to a cart moves stock into a TTL-bound reservation,
+#     checkout consumes it, expiry hands it back
+
+class OutOfStock(Exception):
+    """Raised when one or more lines cannot be fulfilled"""
+    
+    def __init__(self, shortages):
+        self.shortages = shortages  # [(product_id, requested)]
+        super().__init__(f"Insufficient stock for products: {', '.join(str(pid) for pid, _ in shortages)}")
+
+
+# Spreads concurrent carts over the shards of a hot product
+_round_robin = itertools.count()
+
+# Cart-add hot path statements (text() so they are compiled once)
+
+# Take stock from an ordinary (unsharded) product if there is enough
+TAKE_PLAIN_STOCK = text("""
+    UPDATE products SET stock = stock - :quantity, updated_at = :now
+    WHERE id = :product_id AND stock >= :quantity
+    AND NOT EXISTS (SELECT 1 FROM stock_shards WHERE stock_shards.product_id = :product_id)
+    RETURNING id, name, price, category, stock, featured, active, created_at
+""").bindparams(bindparam('now', type_=db.DateTime)).columns(
+    Product.id, *[getattr(Product, field) for field in SNAPSHOT_FIELDS]
+)
+
+# Keep every line of an active cart reserved
+TOUCH_RESERVATIONS = text(
+    "UPDATE stock_reservations SET expires_at = :expires_at WHERE session_id = :session_id"
+).bindparams(bindparam('expires_at', type_=db.DateTime))
+
+# Add to a reservation in one statement
+RESERVATION_UPSERT = text("""
+    INSERT INTO stock_reservations (session_id, product_id, quantity, expires_at, created_at)
+    VALUES (:session_id, :product_id, :quantity, :expires_at, :now)
+    ON CONFLICT (session_id, product_id) DO UPDATE SET
+        quantity = stock_reservations.quantity + excluded.quantity,
+        expires_at = excluded.expires_at
+""").bindparams(bindparam('expires_at', type_=db.DateTime), bindparam('now', type_=db.DateTime))
+
+# Position of products.stock in the (id, *SNAPSHOT_FIELDS) rows returned by stock updates
+STOCK_COLUMN = 1 + SNAPSHOT_FIELDS.index('stock')
+
+# ============ COUNTERS ============
+
+def _product_stock_update(quantities, sign):
+    """Single UPDATE applying signed quantities to several products"""
+    delta = case(quantities, value=Product.id, else_=0)
+    statement = update(Product).where(Product.id.in_(list(quantities)))
+    
+    if sign < 0:
+        # Only rows with enough stock are touched
+        statement = statement.where(Product.stock >= delta).values(stock=Product.stock - delta)
+    else:
+        statement = statement.values(stock=Product.stock + delta)
+    
+    columns = [getattr(Product, field) for field in SNAPSHOT_FIELDS]
+    return statement.returning(Product.id, *columns).execution_options(synchronize_session=False)
+
+def _record_stock_rows(db_session, rows, deltas=None):
+    """Core statements skip ORM events - publish the stock changes ourselves.
+    
+    With deltas ({product_id: signed change}) only changes product cards
+    show are published (sold out, or low-stock count), so ordinary cart
+    activity does not invalidate cached catalog pages.
+    """
+    if deltas is not None:
+        rows = [
+            row for row in rows
+            if Product.shown_stock(row[STOCK_COLUMN]) != Product.shown_stock(row[STOCK_COLUMN] - deltas[row[0]])
+        ]
+    record_product_changes(db_session, [
+        ProductChange('update', row[0], dict(zip(SNAPSHOT_FIELDS, row[1:])), frozenset(['stock']))
+        for row in rows
+    ])
+
+def _shard_update(db_session, product_id, shard, delta):
+    """Apply delta to one shard (never below zero); True if it applied"""
+    statement = update(StockShard).where(
+        StockShard.product_id == product_id,
+        StockShard.shard == shard
+    ).values(quantity=StockShard.quantity + delta)
+    
+    if delta < 0:
+        statement = statement.where(StockShard.quantity >= -delta)
+    
+    return db_session.execute(statement.execution_options(synchronize_session=False)).rowcount == 1
+
+def get_shards(db_session, product_ids):
+    """Get {product_id: {shard: quantity}} for the hot products among product_ids"""
+    shards = defaultdict(dict)
+    rows = db_session.execute(
+        select(StockShard.product_id, StockShard.shard, StockShard.quantity)
+        .where(StockShard.product_id.in_(list(product_ids)))
+    )
+    for product_id, shard, quantity in rows:
+        shards[product_id][shard] = quantity
+    return shards
+
+def _rotated(shards):
+    """Shard numbers starting at the next round-robin position"""
+    order = sorted(shards)
+    start = next(_round_robin) % len(order)
+    return order[start:] + order[:start]
+
+def _take_from_shards(db_session, product_id, quantity, shards):
+    """Take quantity from a hot product's shards; returns [(shard, taken)]"""
+    order = _rotated(shards)
+    
+    # Usually one shard covers the whole line
+    for shard in order:
+        if shards[shard] >= quantity and _shard_update(db_session, product_id, shard, -quantity):
+            return [(shard, quantity)]
+    
+    # Otherwise gather it from several shards
+    taken = []
+    remaining = quantity
+    for shard in order:
+        take = min(remaining, shards[shard])
+        if take > 0 and _shard_update(db_session, product_id, shard, -take):
+            taken.append((shard, take))
+            remaining -= take
+        if remaining == 0:
+            return taken
+    
+    for shard, take in taken:
+        _shard_update(db_session, product_id, shard, take)
+    raise OutOfStock([(product_id, quantity)])
+
+def take_stock(db_session, quantities):
+    """Atomically take stock for {product_id: quantity}.
+    
+    Either every line is taken or nothing is (lines that succeeded are
+    put back) and OutOfStock lists the short lines. Ordinary products
+    are handled in one statement.
+    """
+    quantities = {pid: qty for pid, qty in quantities.items() if qty > 0}
+    if not quantities:
+        return
+    
+    shards = get_shards(db_session, quantities)
+    plain = {pid: qty for pid, qty in quantities.items() if pid not in shards}
+    
+    taken_plain = {}
+    if plain:
+        rows = db_session.execute(_product_stock_update(plain, -1)).all()
+        taken_plain = {row[0]: plain[row[0]] for row in rows}
+        if len(rows) < len(plain):
+            if taken_plain:
+                db_session.execute(_product_stock_update(taken_plain, 1))
+            raise OutOfStock([(pid, qty) for pid, qty in plain.items() if pid not in taken_plain])
+    
+    taken_shards = []
+    try:
+        for product_id, product_shards in shards.items():
+            for shard, take in _take_from_shards(db_session, product_id, quantities[product_id], product_shards):
+                taken_shards.append((product_id, shard, take))
+    except OutOfStock:
+        for product_id, shard, take in taken_shards:
+            _shard_update(db_session, product_id, shard, take)
+        if taken_plain:
+            db_session.execute(_product_stock_update(taken_plain, 1))
+        raise
+    
+    if plain:
+        _record_stock_rows(db_session, rows, {pid: -qty for pid, qty in plain.items()})
+
+def return_stock(db_session, quantities):
+    """Hand stock for {product_id: quantity} back to the counters"""
+    quantities = {pid: qty for pid, qty in quantities.items() if qty > 0}
+    if not quantities:
+        return
+    
+    shards = get_shards(db_session, quantities)
+    plain = {pid: qty for pid, qty in quantities.items() if pid not in shards}
+    
+    if plain:
+        _record_stock_rows(db_session, db_session.execute(_product_stock_update(plain, 1)).all(), plain)
+    
+    for product_id, product_shards in shards.items():
+        _shard_update(db_session, product_id, _rotated(product_shards)[0], quantities[product_id])
+
+def available_stock(db_session, product_id):
+    """Unreserved stock of one product (summing shards for hot products)"""
+    total, count = db_session.query(
+        func.coalesce(func.sum(StockShard.quantity), 0), func.count(StockShard.shard)
+    ).filter(StockShard.product_id == product_id).one()
+    if count:
+        return total
+    return db_session.query(Product.stock).filter(Product.id == product_id).scalar() or 0
+
+# ============ RESERVATIONS ============
+
+def _expiry():
+    """Expiry for a reservation touched now"""
+    return datetime.utcnow() + timedelta(seconds=Config.RESERVATION_TTL_SECONDS)
+
+def reserve(db_session, session_id, product_id, quantity):
+    """Make the session hold exactly quantity units of a product.
+    
+    Takes or returns only the difference from what is already held and
+    extends the expiry of all the session's reservations. Raises
+    OutOfStock without changing anything if stock is short.
+    """
+    reservation = db_session.query(StockReservation).filter_by(
+        session_id=session_id, product_id=product_id
+    ).first()
+    held = reservation.quantity if reservation else 0
+    
+    if quantity > held:
+        take_stock(db_session, {product_id: quantity - held})
+    elif quantity < held:
+        return_stock(db_session, {product_id: held - quantity})
+    
+    expires_at = _expiry()
+    if quantity <= 0:
+        if reservation:
+            db_session.delete(reservation)
+    elif reservation:
+        reservation.quantity = quantity
+    else:
+        db_session.add(StockReservation(
+            session_id=session_id, product_id=product_id,
+            quantity=quantity, expires_at=expires_at
+        ))
+    
+    # Activity on the cart keeps every line reserved
+    db_session.execute(
+        update(StockReservation).where(StockReservation.session_id == session_id)
+        .values(expires_at=expires_at).execution_options(synchronize_session=False)
+    )
+    db_session.flush()
+
+def reserve_more(db_session, session_id, product_id, quantity):
+    """Add quantity to the session's reservation of a product (cart add fast path).
+    
+    Ordinary products take the stock in one conditional UPDATE and the
+    reservation is a single UPSERT; hot products fall back to
+    take_stock. Raises OutOfStock without changing anything if stock is
+    short (or the product does not exist).
+    """
+    now = datetime.utcnow()
+    rows = db_session.execute(TAKE_PLAIN_STOCK, {
+        'product_id': product_id,
+        'quantity': quantity,
+        'now': now
+    }).all()
+    
+    if rows:
+        _record_stock_rows(db_session, rows, {product_id: -quantity})
+    else:
+        take_stock(db_session, {product_id: quantity})
+    
+    expires_at = _expiry()
+    db_session.execute(RESERVATION_UPSERT, {
+        'session_id': session_id,
+        'product_id': product_id,
+        'quantity': quantity,
+        'expires_at': expires_at,
+        'now': now
+    })
+    db_session.execute(TOUCH_RESERVATIONS, {'session_id': session_id, 'expires_at': expires_at})
+
+def release_reservations(db_session, session_id, product_ids=None):
+    """Drop the session's reservations (optionally only some products) and return their stock"""
+    statement = delete(StockReservation).where(StockReservation.session_id == session_id)
+    if product_ids is not None:
+        statement = statement.where(StockReservation.product_id.in_(list(product_ids)))
+    
+    rows = db_session.execute(
+        statement.returning(StockReservation.product_id, StockReservation.quantity)
+        .execution_options(synchronize_session=False)
+    ).all()
+    
+    returned = defaultdict(int)
+    for product_id, quantity in rows:
+        returned[product_id] += quantity
+    return_stock(db_session, returned)
+
+def consume_reservations(db_session, session_id, quantities):
+    """Turn the session's reservations into a sale of {product_id: quantity}.
+    
+    Lines whose reservation expired (or never existed) take stock now;
+    anything held beyond the sale goes back. Raises OutOfStock without
+    changing anything if stock is short.
+    """
+    held = dict(db_session.query(StockReservation.product_id, StockReservation.quantity).filter(
+        StockReservation.session_id == session_id
+    ).all())
+    
+    take_stock(db_session, {pid: qty - held.get(pid, 0) for pid, qty in quantities.items()})
+    
+    db_session.execute(
+        delete(StockReservation).where(StockReservation.session_id == session_id)
+        .execution_options(synchronize_session=False)
+    )
+    return_stock(db_session, {pid: qty - quantities.get(pid, 0) for pid, qty in held.items()})
+
+def reclaim_expired(db_session, limit):
+    """Return one batch of expired reservations to stock; returns rows reclaimed"""
+    now = datetime.utcnow()
+    expired = [row[0] for row in db_session.query(StockReservation.id).filter(
+        StockReservation.expires_at < now
+    ).order_by(StockReservation.expires_at).limit(limit)]
+    
+    if not expired:
+        return 0
+    
+    # Re-check expiry: the cart may have been touched since the select
+    rows = db_session.execute(
+        delete(StockReservation).where(
+            StockReservation.id.in_(expired),
+            StockReservation.expires_at < now
+        ).returning(StockReservation.product_id, StockReservation.quantity)
+        .execution_options(synchronize_session=False)
+    ).all()
+    
+    returned = defaultdict(int)
+    for product_id, quantity in rows:
+        returned[product_id] += quantity
+    return_stock(db_session, returned)
+    return len(rows)
+
+# ============ HOT PRODUCTS ============
+
+def shard_product(db_session, product_id, shards=None):
+    """Spread a product's unreserved stock over shard rows"""
+    shards = shards or Config.STOCK_SHARDS
+    total = available_stock(db_session, product_id)
+    
+    db_session.query(StockShard).filter_by(product_id=product_id).delete(synchronize_session=False)
+    for shard in range(shards):
+        db_session.add(StockShard(
+            product_id=product_id,
+            shard=shard,
+            quantity=total // shards + (1 if shard < total % shards else 0)
+        ))
+    db_session.flush()
+    return total
+
+def unshard_product(db_session, product_id):
+    """Move a hot product's stock back into products.stock"""
+    total = available_stock(db_session, product_id)
+    db_session.query(StockShard).filter_by(product_id=product_id).delete(synchronize_session=False)
+    rows = db_session.execute(
+        update(Product).where(Product.id == product_id).values(stock=total)
+        .returning(Product.id, *[getattr(Product, field) for field in SNAPSHOT_FIELDS])
+        .execution_options(synchronize_session=False)
+    ).all()
+    _record_stock_rows(db_session, rows)
+    return total
+
+def sync_shard_totals(db_session):
+    """Refresh the products.stock display mirror of every hot product"""
+    hot = select(StockShard.product_id).distinct()
+    totals = select(func.sum(StockShard.quantity)).where(
+        StockShard.product_id == Product.id
+    ).scalar_subquery()
+    
+    previous = dict(db_session.query(Product.id, Product.stock).filter(Product.id.in_(hot)).all())
+    rows = db_session.execute(
+        update(Product).where(
+            Product.id.in_(hot),
+            Product.stock != totals
+        ).values(stock=totals)
+        .returning(Product.id, *[getattr(Product, field) for field in SNAPSHOT_FIELDS])
+        .execution_options(synchronize_session=False)
+    ).all()
+    _record_stock_rows(db_session, rows, {row[0]: row[STOCK_COLUMN] - previous[row[0]] for row in rows})
+    return len(rows)
+
+# ============ REAPER ============
+
+class ReservationReaper(BackgroundWorker):
+    """Background thread returning expired reservations to stock in small batches"""
+    
+    name = 'reservation-reaper'
+    enabled_setting = 'RESERVATIONS_ENABLED'
+    
+    def __init__(self):
+        super().__init__()
+        self.reclaimed = 0
+        self.runs = 0
+    
+    def interval(self):
+        return Config.RESERVATION_REAP_INTERVAL_SECONDS
+    
+    def run_once(self):
+        """Reclaim everything expired (one short transaction per batch), then sync hot totals"""
+        total = 0
+        while True:
+            reclaimed = reclaim_expired(db.session, Config.RESERVATION_REAP_BATCH_SIZE)
+            db.session.commit()
+            total += reclaimed
+            if reclaimed < Config.RESERVATION_REAP_BATCH_SIZE:
+                break
+        
+        sync_shard_totals(db.session)
+        db.session.commit()
+        
+        self.reclaimed += total
+        self.runs += 1
+        return total
+
+
+# Shared reaper instance
+reservation_reaper = ReservationReaper()
+
+# ========================================
+# END OF INVENTORY
+# ========================================
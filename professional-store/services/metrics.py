@@ -0,0 +1,264 @@
+# ========================================
+# JUSTIN E-COMMERCE - Request Metrics
+# ========================================
+
+import bisect
+import hmac
+import threading
+import time
+from flask import Response, abort, request
+from sqlalchemy import event
+from models import db
+
+# Prometheus-style default latency buckets (seconds)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+# ============ PRIMITIVES ============
+
+class Histogram:
+    """Cumulative-bucket histogram (caller holds the lock)"""
+    
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+    
+    def cumulative(self):
+        """(le, cumulative count) pairs ending with +Inf"""
+        total = 0
+        for bound, count in zip(list(self.buckets) + ['+Inf'], self.counts):
+            total += count
+            yield bound, total
+
+
+class RequestTimings:
+    """SQL work done on behalf of one request"""
+    
+    __slots__ = ('started', 'queries', 'db_seconds', '_query_started')
+    
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self._query_started = None
+
+
+def escape_label(value):
+    """Escape a label value for the text exposition format"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def format_labels(labels):
+    """Prometheus label set: {a="1",b="2"}"""
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{escape_label(value)}"' for name, value in labels) + '}'
+
+# ============ COLLECTOR ============
+
+class RequestMetrics:
+    """Per-endpoint latency histograms and SQL counts.
+    
+    Statements are attributed to the request running on the same thread.
+    Work done off-request (the group-commit writer, background workers)
+    is counted under endpoint "background".
+    """
+    
+    def __init__(self):
+        self.app = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.latency = {}  # (endpoint, method) -> Histogram
+        self.queries_per_request = {}  # endpoint -> Histogram
+        self.responses = {}  # (endpoint, method, status) -> count
+        self.queries = {}  # endpoint -> statements
+        self.db_seconds = {}  # endpoint -> seconds
+    
+    def init_app(self, app):
+        """Hook the request lifecycle and SQL events, and add /metrics"""
+        self.app = app
+        if not app.config.get('METRICS_ENABLED', True):
+            return
+        
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.teardown_request(self._clear_request)
+        app.add_url_rule('/metrics', 'metrics', self.metrics_view)
+        
+        with app.app_context():
+            for engine in set(db.engines.values()):
+                event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+                event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+    
+    # ============ SQL EVENTS ============
+    
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        timings = getattr(self._local, 'current', None)
+        if timings is None:
+            self._local.background_started = time.perf_counter()
+        else:
+            timings._query_started = time.perf_counter()
+    
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        timings = getattr(self._local, 'current', None)
+        if timings is not None:
+            timings.queries += 1
+            timings.db_seconds += time.perf_counter() - timings._query_started
+            return
+        
+        started = getattr(self._local, 'background_started', None)
+        if started is not None:
+            with self._lock:
+                self.queries['background'] = self.queries.get('background', 0) + 1
+                self.db_seconds['background'] = self.db_seconds.get('background', 0.0) + time.perf_counter() - started
+    
+    # ============ REQUEST LIFECYCLE ============
+    
+    def _start_request(self):
+        self._local.current = RequestTimings()
+    
+    def _finish_request(self, response):
+        """Record the request and add Server-Timing in debug"""
+        timings = getattr(self._local, 'current', None)
+        if timings is None:
+            return response
+        
+        elapsed = time.perf_counter() - timings.started
+        endpoint = request.endpoint or 'unmatched'
+        key = (endpoint, request.method)
+        
+        with self._lock:
+            histogram = self.latency.get(key)
+            if histogram is None:
+                histogram = self.latency[key] = Histogram(LATENCY_BUCKETS)
+            histogram.observe(elapsed)
+            
+            per_request = self.queries_per_request.get(endpoint)
+            if per_request is None:
+                per_request = self.queries_per_request[endpoint] = Histogram(QUERY_COUNT_BUCKETS)
+            per_request.observe(timings.queries)
+            
+            status_key = key + (response.status_code,)
+            self.responses[status_key] = self.responses.get(status_key, 0) + 1
+            self.queries[endpoint] = self.queries.get(endpoint, 0) + timings.queries
+            self.db_seconds[endpoint] = self.db_seconds.get(endpoint, 0.0) + timings.db_seconds
+        
+        if self.app.debug or self.app.config.get('METRICS_SERVER_TIMING', False):
+            response.headers.add(
+                'Server-Timing',
+                f'app;dur={elapsed * 1000:.1f}, db;dur={timings.db_seconds * 1000:.1f};desc="{timings.queries} queries"'
+            )
+        return response
+    
+    def _clear_request(self, exc=None):
+        self._local.current = None
+    
+    def current(self):
+        """Timings of the request on this thread, or None"""
+        return getattr(self._local, 'current', None)
+    
+    # ============ EXPORT ============
+    
+    def service_counters(self):
+        """(name, type, help, value) for counters kept by other services"""
+        from services.page_cache import catalog_cache
+        from services.write_queue import write_queue
+        from services.email_outbox import outbox_worker
+        from services.inventory import reservation_reaper
+        from services.reaper import cart_reaper
+        from services.related_products import related_updater
+        
+        counters = [
+            ('store_catalog_cache_hits_total', 'counter', 'Rendered catalog pages served from cache', catalog_cache.hits),
+            ('store_catalog_cache_misses_total', 'counter', 'Rendered catalog pages built', catalog_cache.misses),
+            ('store_write_queue_batches_total', 'counter', 'Group commits', write_queue.batches),
+            ('store_write_queue_intents_total', 'counter', 'Write intents committed by the writer thread', write_queue.intents),
+            ('store_write_queue_depth', 'gauge', 'Write intents waiting', write_queue.depth()),
+            ('store_outbox_sent_total', 'counter', 'Emails sent', outbox_worker.sent),
+            ('store_outbox_failed_total', 'counter', 'Failed email attempts', outbox_worker.failed),
+            ('store_outbox_dead_total', 'counter', 'Emails dead-lettered', outbox_worker.dead),
+            ('store_reservations_reclaimed_total', 'counter', 'Expired stock reservations returned to stock', reservation_reaper.reclaimed),
+            ('store_reservation_reaper_runs_total', 'counter', 'Reservation reaper runs', reservation_reaper.runs),
+            ('store_related_products_refreshed_total', 'counter', 'Related lists recomputed incrementally', related_updater.refreshed),
+            ('store_related_products_rebuilds_total', 'counter', 'Full related products rebuilds', related_updater.rebuilds),
+        ]
+        for name, value in cart_reaper.stats().items():
+            kind = 'gauge' if name == 'last_run_seconds' else 'counter'
+            suffix = '' if kind == 'gauge' else '_total'
+            counters.append((f'store_cart_reaper_{name}{suffix}', kind, f'Cart reaper {name.replace("_", " ")}', value))
+        
+        interface = self.app.session_interface
+        if hasattr(interface, 'reads'):
+            counters.append(('store_session_reads_total', 'counter', 'Session store reads', interface.reads))
+            counters.append(('store_session_writes_total', 'counter', 'Session store writes', interface.writes))
+        return counters
+    
+    def render(self):
+        """All metrics in Prometheus text exposition format"""
+        lines = []
+        
+        def header(name, kind, help_text):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+        
+        def histogram_lines(name, histograms):
+            for labels, histogram in histograms:
+                for bound, count in histogram.cumulative():
+                    lines.append(f'{name}_bucket{format_labels(labels + [("le", bound)])} {count}')
+                lines.append(f'{name}_sum{format_labels(labels)} {histogram.sum:.6f}')
+                lines.append(f'{name}_count{format_labels(labels)} {histogram.count}')
+        
+        with self._lock:
+            header('store_http_request_duration_seconds', 'histogram', 'Request latency by endpoint')
+            histogram_lines('store_http_request_duration_seconds', [
+                ([('endpoint', endpoint), ('method', method)], histogram)
+                for (endpoint, method), histogram in sorted(self.latency.items())
+            ])
+            
+            header('store_http_responses_total', 'counter', 'Responses by endpoint and status')
+            for (endpoint, method, status), count in sorted(self.responses.items()):
+                lines.append(f'store_http_responses_total{format_labels([("endpoint", endpoint), ("method", method), ("status", status)])} {count}')
+            
+            header('store_db_queries_per_request', 'histogram', 'SQL statements issued per request')
+            histogram_lines('store_db_queries_per_request', [
+                ([('endpoint', endpoint)], histogram)
+                for endpoint, histogram in sorted(self.queries_per_request.items())
+            ])
+            
+            header('store_db_queries_total', 'counter', 'SQL statements by endpoint')
+            for endpoint, count in sorted(self.queries.items()):
+                lines.append(f'store_db_queries_total{format_labels([("endpoint", endpoint)])} {count}')
+            
+            header('store_db_seconds_total', 'counter', 'Time spent in SQL by endpoint')
+            for endpoint, seconds in sorted(self.db_seconds.items()):
+                lines.append(f'store_db_seconds_total{format_labels([("endpoint", endpoint)])} {seconds:.6f}')
+        
+        for name, kind, help_text, value in self.service_counters():
+            header(name, kind, help_text)
+            lines.append(f'{name} {value}')
+        
+        return '\n'.join(lines) + '\n'
+    
+    def metrics_view(self):
+        """GET /metrics (bearer token required; open without one only in debug)"""
+        token = self.app.config.get('METRICS_TOKEN')
+        if not token:
+            if not self.app.debug:
+                abort(404)
+        elif not hmac.compare_digest(request.headers.get('Authorization', '').encode(), f'Bearer {token}'.encode()):
+            abort(401)
+        return Response(self.render(), mimetype='text/plain; version=0.0.4')
+
+
+# Shared metrics instance
+request_metrics = RequestMetrics()
+
+# ========================================
+# END OF REQUEST METRICS
+# ========================================
@@ -0,0 +1,69 @@
+# ========================================
+# JUSTIN E-COMMERCE - Catalog Page Cache
+# ========================================
+
+from collections import OrderedDict
+import threading
+from config import Config
+from services.catalog_events import on_catalog_change
+
+
+class VersionedCache:
+    """LRU cache invalidated by a version counter.
+    
+    Entries are stored with the version that was current when their data
+    was read, and are only served while that version is still current.
+    """
+    
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = 0
+        self.hits = 0
+        self.misses = 0
+    
+    @property
+    def version(self):
+        """Current version (read before loading data for set())"""
+        return self._version
+    
+    def get(self, key):
+        """Get cached value for key, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != self._version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+    
+    def set(self, key, value, version):
+        """Store value read at the given version"""
+        with self._lock:
+            if version != self._version:
+                return
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def bump(self):
+        """Invalidate every entry"""
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+
+
+# Rendered /store product grids keyed by (category, search, sort)
+catalog_cache = VersionedCache(max_entries=Config.CATALOG_CACHE_SIZE)
+
+@on_catalog_change
+def _bump_catalog_version(changes):
+    """Any committed product change invalidates rendered catalog pages"""
+    catalog_cache.bump()
+
+# ========================================
+# END OF CATALOG PAGE CACHE
+# ========================================
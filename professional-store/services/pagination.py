@@ -0,0 +1,112 @@
+# ========================================
+# JUSTIN E-COMMERCE - Keyset Pagination
+# ========================================
+
+import base64
+from datetime import datetime
+import json
+from sqlalchemy import and_, or_, literal
+from models import Product
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+def sort_keys(sort, rank=None):
+    """Get keyset ordering for a catalog sort mode as [(column, descending)].
+    
+    Every ordering ends with the primary key so it is total and a cursor
+    always points at exactly one row.
+    """
+    if sort == 'price_low':
+        return [(Product.price, False), (Product.id, False)]
+    if sort == 'price_high':
+        return [(Product.price, True), (Product.id, True)]
+    if sort == 'name':
+        return [(Product.name, False), (Product.id, False)]
+    
+    # featured (default) - best search match first when searching
+    keys = [(Product.featured, True), (Product.created_at, True), (Product.id, True)]
+    if rank is not None:
+        keys.insert(0, (rank, False))
+    return keys
+
+def encode_cursor(sort, values):
+    """Encode the sort key values of the last row into an opaque cursor"""
+    payload = [sort] + [
+        value.isoformat() if isinstance(value, datetime) else value
+        for value in values
+    ]
+    data = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip('=')
+
+def decode_cursor(cursor, sort, keys):
+    """Decode a cursor into sort key values (raises InvalidCursor)"""
+    try:
+        data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        payload = json.loads(data)
+    except (ValueError, TypeError):
+        raise InvalidCursor('Malformed cursor')
+    
+    if not isinstance(payload, list) or len(payload) != len(keys) + 1 or payload[0] != sort:
+        raise InvalidCursor('Cursor does not match this sort order')
+    
+    return [_decode_value(column, value) for (column, descending), value in zip(keys, payload[1:])]
+
+def _decode_value(column, value):
+    """Convert a decoded cursor value to the sort column's Python type (raises InvalidCursor)"""
+    if value is None:
+        return None
+    
+    python_type = column.type.python_type
+    if python_type is datetime:
+        try:
+            return datetime.fromisoformat(value)
+        except (ValueError, TypeError):
+            raise InvalidCursor('Malformed cursor')
+    
+    # JSON has no int/float distinction for whole numbers, and bool is an int subclass
+    if python_type is float and isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+    if not isinstance(value, python_type) or (isinstance(value, bool) and python_type is not bool):
+        raise InvalidCursor('Malformed cursor')
+    return value
+
+def seek_after(keys, values):
+    """Build the WHERE clause selecting rows after the given sort key values"""
+    # Bind values as parameters (booleans may not be compared with < or > directly)
+    values = [literal(value) for value in values]
+    
+    conditions = []
+    for index, (column, descending) in enumerate(keys):
+        equal_prefix = [keys[i][0] == values[i] for i in range(index)]
+        beyond = column < values[index] if descending else column > values[index]
+        conditions.append(and_(*equal_prefix, beyond))
+    return or_(*conditions)
+
+def paginate(query, sort, keys, cursor=None, page_size=24):
+    """Get one keyset page of a Product query.
+    
+    Returns (products, next_cursor); next_cursor is None on the last page.
+    """
+    if cursor:
+        query = query.filter(seek_after(keys, decode_cursor(cursor, sort, keys)))
+    
+    query = query.order_by(*[
+        column.desc() if descending else column.asc()
+        for column, descending in keys
+    ])
+    
+    # Select the key columns alongside each product to build the cursor
+    rows = query.add_columns(*[column for column, descending in keys]).limit(page_size + 1).all()
+    
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(sort, list(rows[-1][1:]))
+    
+    return [row[0] for row in rows], next_cursor
+
+# ========================================
+# END OF KEYSET PAGINATION
+# ========================================
@@ -0,0 +1,205 @@
+# ========================================
+# JUSTIN E-COMMERCE - Payment Gateway
+# ========================================
+
+from collections import OrderedDict
+import hashlib
+import itertools
+import secrets
+import threading
+from config import Config
+
+class PaymentError(Exception):
+    """Raised when the payment provider rejects or fails a request"""
+
+
+class StripeGateway:
+    """Stripe PaymentIntents over a pooled HTTP session with strict timeouts"""
+    
+    def __init__(self, api_key):
+        import requests
+        import stripe
+        from requests.adapters import HTTPAdapter
+        
+        self.stripe = stripe
+        stripe.api_key = api_key
+        stripe.max_network_retries = Config.PAYMENT_MAX_RETRIES  # Safe: every call has an idempotency key
+        
+        # Keep-alive connection pool shared by all requests
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=Config.PAYMENT_POOL_SIZE,
+            pool_maxsize=Config.PAYMENT_POOL_SIZE
+        )
+        session.mount('https://', adapter)
+        stripe.default_http_client = stripe.http_client.RequestsClient(
+            timeout=Config.PAYMENT_TIMEOUT_SECONDS,
+            session=session
+        )
+    
+    def create_intent(self, amount, currency, metadata, idempotency_key):
+        """Create a payment intent; returns {'id', 'client_secret', 'amount'}"""
+        try:
+            intent = self.stripe.PaymentIntent.create(
+                amount=amount,
+                currency=currency,
+                metadata=metadata,
+                idempotency_key=idempotency_key
+            )
+        except self.stripe.error.StripeError as e:
+            raise PaymentError(str(e))
+        return {'id': intent.id, 'client_secret': intent.client_secret, 'amount': intent.amount}
+    
+    def update_intent(self, intent_id, amount, idempotency_key):
+        """Change the amount of an unconfirmed payment intent"""
+        try:
+            intent = self.stripe.PaymentIntent.modify(
+                intent_id,
+                amount=amount,
+                idempotency_key=idempotency_key
+            )
+        except self.stripe.error.StripeError as e:
+            raise PaymentError(str(e))
+        return {'id': intent.id, 'client_secret': intent.client_secret, 'amount': intent.amount}
+
+
+class MockGateway:
+    """In-memory payment gateway for development and load tests (no network).
+    
+    Like a real provider, idempotency keys are only remembered for a
+    while: the most recent max_idempotency_keys are kept (LRU).
+    """
+    
+    def __init__(self, max_idempotency_keys=10000):
+        self.intents = {}
+        self.max_idempotency_keys = max_idempotency_keys
+        self._idempotent = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.calls = 0
+    
+    def _replay(self, idempotency_key, create):
+        with self._lock:
+            self.calls += 1
+            if idempotency_key in self._idempotent:
+                self._idempotent.move_to_end(idempotency_key)
+            else:
+                self._idempotent[idempotency_key] = create()
+                while len(self._idempotent) > self.max_idempotency_keys:
+                    self._idempotent.popitem(last=False)
+            return dict(self._idempotent[idempotency_key])
+    
+    def create_intent(self, amount, currency, metadata, idempotency_key):
+        """Create a payment intent; returns {'id', 'client_secret', 'amount'}"""
+        def create():
+            intent_id = f"pi_mock_{next(self._ids)}"
+            self.intents[intent_id] = {
+                'id': intent_id,
+                'client_secret': f"{intent_id}_secret_{secrets.token_hex(8)}",
+                'amount': amount
+            }
+            return self.intents[intent_id]
+        return self._replay(idempotency_key, create)
+    
+    def update_intent(self, intent_id, amount, idempotency_key):
+        """Change the amount of a payment intent"""
+        def update():
+            if intent_id not in self.intents:
+                raise PaymentError(f"No such payment intent: {intent_id}")
+            self.intents[intent_id]['amount'] = amount
+            return self.intents[intent_id]
+        return self._replay(idempotency_key, update)
+
+
+def create_gateway(name):
+    """Create the gateway named by Config.PAYMENT_GATEWAY"""
+    if name == 'stripe':
+        return StripeGateway(Config.STRIPE_SECRET_KEY)
+    if name == 'mock':
+        return MockGateway()
+    raise ValueError(f"Unknown payment gateway: {name}")
+
+def idempotency_key(*parts):
+    """Stable idempotency key for a payment request"""
+    return hashlib.sha256(':'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+class PaymentIntents:
+    """Reuses one payment intent per session while the cart stays the same.
+    
+    The intent is remembered in the visitor's session with the cart
+    fingerprint and total it was created for. Same cart -> no provider
+    call; changed cart -> the existing intent's amount is updated.
+    
+    Idempotency keys include a per-session generation that moves on with
+    every update and every forget(), so returning to an earlier cart
+    (X -> Y -> X -> Y) or repeating a cart after an order never replays
+    an old provider response.
+    """
+    
+    SESSION_KEY = 'payment_intent'
+    GENERATION_KEY = 'payment_intent_generation'
+    
+    def __init__(self):
+        self.gateway = None
+    
+    def init_app(self, app):
+        """Create the configured gateway"""
+        self.gateway = create_gateway(app.config['PAYMENT_GATEWAY'])
+    
+    def get_or_create(self, flask_session, session_id, summary, metadata):
+        """Get a payment intent matching the cart summary"""
+        fingerprint = summary['fingerprint']
+        amount = summary['total']
+        cached = flask_session.get(self.SESSION_KEY)
+        
+        if cached and cached['fingerprint'] == fingerprint and cached['amount'] == amount:
+            return cached
+        
+        intent = None
+        if cached:
+            generation = self._next_generation(flask_session)
+            try:
+                intent = self.gateway.update_intent(
+                    cached['id'], amount,
+                    idempotency_key=idempotency_key('update', cached['id'], generation, fingerprint, amount)
+                )
+            except PaymentError:
+                # Intent already confirmed or canceled - start a new one
+                intent = None
+        
+        if intent is None:
+            intent = self.gateway.create_intent(
+                amount, Config.STRIPE_CURRENCY, metadata,
+                idempotency_key=idempotency_key(
+                    'create', session_id, flask_session.get(self.GENERATION_KEY, 0), fingerprint, amount
+                )
+            )
+        
+        cached = {
+            'id': intent['id'],
+            'client_secret': intent['client_secret'],
+            'fingerprint': fingerprint,
+            'amount': amount
+        }
+        flask_session[self.SESSION_KEY] = cached
+        return cached
+    
+    def forget(self, flask_session):
+        """Drop the session's intent once it has been used for an order"""
+        flask_session.pop(self.SESSION_KEY, None)
+        self._next_generation(flask_session)
+    
+    def _next_generation(self, flask_session):
+        """Advance the session's intent generation; returns the new value"""
+        generation = flask_session.get(self.GENERATION_KEY, 0) + 1
+        flask_session[self.GENERATION_KEY] = generation
+        return generation
+
+
+# Shared instance
+payment_intents = PaymentIntents()
+
+# ========================================
+# END OF PAYMENT GATEWAY
+# ========================================
@@ -0,0 +1,179 @@
+# ========================================
+# JUSTIN E-COMMERCE - Query Auditor
+# ========================================
+
+from collections import deque
+import os
+import re
+import sys
+import threading
+import time
+from flask import request
+from sqlalchemy import event
+from models import db
+
+# Literals and expanded IN lists collapse so "the same query, different ids" groups together
+NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+STRING = re.compile(r"'(?:[^']|'')*'")
+IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+WHITESPACE = re.compile(r"\s+")
+SELECT_LIST = re.compile(r"^SELECT .+? FROM ", re.IGNORECASE)
+
+
+class QueryProblem(Exception):
+    """Raised at the end of a request in 'raise' mode"""
+
+
+def normalize_sql(statement):
+    """Statement shape with literals and parameter lists removed"""
+    statement = STRING.sub('?', statement)
+    statement = NUMBER.sub('?', statement)
+    statement = IN_LIST.sub('(?)', statement)
+    return WHITESPACE.sub(' ', statement).strip()
+
+def shorten_sql(statement, limit=160):
+    """Statement for reports: column list elided, truncated"""
+    statement = SELECT_LIST.sub('SELECT … FROM ', statement)
+    return statement if len(statement) <= limit else statement[:limit] + '…'
+
+
+class StatementGroup:
+    """Executions of one normalized statement within a request"""
+    
+    __slots__ = ('count', 'seconds', 'slowest', 'location')
+    
+    def __init__(self, location):
+        self.count = 0
+        self.seconds = 0.0
+        self.slowest = 0.0
+        self.location = location
+
+
+class QueryAuditor:
+    """Finds N+1 patterns and slow statements per request.
+    
+    Statements are grouped by normalized SQL. A group executed at least
+    QUERY_REPEAT_THRESHOLD times, or a statement slower than
+    QUERY_SLOW_MS, is reported with the template line or source line
+    that issued it. QUERY_AUDIT_MODE is 'off', 'warn' (print) or
+    'raise' (fail the request, for tests and CI).
+    """
+    
+    def __init__(self):
+        self.app = None
+        self.mode = 'off'
+        self.repeat_threshold = 5
+        self.slow_seconds = 0.1
+        self.findings = deque(maxlen=1000)  # Most recent problems, newest last
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._root = None
+    
+    def init_app(self, app):
+        """Read settings and hook the request lifecycle (nothing is hooked when off)"""
+        self.app = app
+        self.mode = app.config.get('QUERY_AUDIT_MODE', 'off')
+        self.repeat_threshold = app.config.get('QUERY_REPEAT_THRESHOLD', 5)
+        self.slow_seconds = app.config.get('QUERY_SLOW_MS', 100) / 1000
+        self._root = os.path.abspath(app.root_path) + os.sep
+        
+        if self.mode not in ('off', 'warn', 'raise'):
+            raise ValueError(f"Unknown QUERY_AUDIT_MODE: {self.mode}")
+        if self.mode == 'off':
+            return
+        
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.teardown_request(self._clear_request)
+        
+        with app.app_context():
+            for engine in set(db.engines.values()):
+                event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+                event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+    
+    # ============ SQL EVENTS ============
+    
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if getattr(self._local, 'groups', None) is not None:
+            self._local.query_started = time.perf_counter()
+    
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        groups = getattr(self._local, 'groups', None)
+        if groups is None:
+            return
+        
+        elapsed = time.perf_counter() - self._local.query_started
+        key = normalize_sql(statement)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = StatementGroup(self.caller())
+        group.count += 1
+        group.seconds += elapsed
+        group.slowest = max(group.slowest, elapsed)
+    
+    def caller(self):
+        """Innermost template line or app source line on the stack"""
+        frame = sys._getframe(2)
+        while frame is not None:
+            template = frame.f_globals.get('__jinja_template__')
+            if template is not None:
+                name = template.name or template.filename
+                return f"template {name}:{template.get_corresponding_lineno(frame.f_lineno)}"
+            
+            filename = frame.f_code.co_filename
+            if (filename.startswith(self._root) and 'site-packages' not in filename
+                    and not filename.endswith('query_audit.py')):
+                return f"{os.path.relpath(filename, self._root)}:{frame.f_lineno} in {frame.f_code.co_name}"
+            frame = frame.f_back
+        return 'unknown'
+    
+    # ============ REQUEST LIFECYCLE ============
+    
+    def _start_request(self):
+        self._local.groups = {}
+    
+    def _finish_request(self, response):
+        """Report repeated and slow statements for this request"""
+        groups = getattr(self._local, 'groups', None)
+        self._local.groups = None
+        if not groups:
+            return response
+        
+        problems = self.check(groups)
+        if not problems:
+            return response
+        
+        label = f"{request.method} {request.path} ({request.endpoint})"
+        with self._lock:
+            self.findings.extend(f"{label}: {problem}" for problem in problems)
+        
+        report = '\n'.join(f"  - {problem}" for problem in problems)
+        if self.mode == 'raise':
+            raise QueryProblem(f"Query problems in {label}:\n{report}")
+        print(f"⚠️ Query problems in {label}:\n{report}")
+        return response
+    
+    def _clear_request(self, exc=None):
+        self._local.groups = None
+    
+    def check(self, groups):
+        """Problems (one line each) in one request's statement groups"""
+        problems = []
+        for statement, group in groups.items():
+            if group.count >= self.repeat_threshold:
+                problems.append(
+                    f"N+1: {group.count}x at {group.location} ({group.seconds * 1000:.1f}ms): {shorten_sql(statement)}"
+                )
+            if group.slowest >= self.slow_seconds:
+                problems.append(
+                    f"slow: {group.slowest * 1000:.1f}ms at {group.location}: {shorten_sql(statement)}"
+                )
+        return problems
+
+
+# Shared auditor instance
+query_auditor = QueryAuditor()
+
+# ========================================
+# END OF QUERY AUDITOR
+# ========================================
@@ -0,0 +1,147 @@
+# ========================================
+# JUSTIN E-COMMERCE - Abandoned Cart Reaper
+# ========================================
+
+import os
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import delete
+from models import db, Cart
+from config import Config
+from services.cart_summary import cart_summaries
+from services.background import BackgroundWorker
+
+class CartReaper(BackgroundWorker):
+    """Background thread deleting idle carts and expired sessions.
+    
+    Work is done in batches of REAPER_BATCH_SIZE with a commit after
+    each one, so the cart table is never locked for long.
+    """
+    
+    name = 'cart-reaper'
+    enabled_setting = 'REAPER_ENABLED'
+    
+    def __init__(self):
+        super().__init__()
+        self.runs = 0
+        self.cart_rows = 0
+        self.cart_sessions = 0
+        self.session_files = 0
+        self.stored_sessions = 0
+        self.last_run_seconds = 0.0
+    
+    def interval(self):
+        return Config.REAPER_INTERVAL_SECONDS
+    
+    def reap_carts_batch(self, cutoff):
+        """Delete one batch of carts idle since before cutoff; returns (sessions selected, sessions reaped)"""
+        session_ids = [row[0] for row in db.session.query(Cart.session_id).filter(
+            Cart.updated_at < cutoff
+        ).distinct().limit(Config.REAPER_BATCH_SIZE)]
+        
+        if not session_ids:
+            return 0, 0
+        
+        # Every cart change touches all of the session's rows, so a session
+        # active since the select keeps all of its rows
+        deleted = db.session.execute(
+            delete(Cart).where(
+                Cart.session_id.in_(session_ids),
+                Cart.updated_at < cutoff
+            ).returning(Cart.session_id).execution_options(synchronize_session=False)
+        ).all()
+        db.session.commit()
+        
+        # Cached counts and totals of the emptied carts are stale now
+        reaped = {session_id for session_id, in deleted}
+        for session_id in reaped:
+            cart_summaries.invalidate(session_id)
+        
+        self.cart_rows += len(deleted)
+        self.cart_sessions += len(reaped)
+        return len(session_ids), len(reaped)
+    
+    def reap_session_files(self, cutoff):
+        """Delete filesystem sessions not written since cutoff; returns files deleted"""
+        if self.app.config.get('SESSION_TYPE') != 'filesystem':
+            return 0
+        
+        session_dir = self.app.config.get('SESSION_FILE_DIR') or os.path.join(os.getcwd(), 'flask_session')
+        if not os.path.isdir(session_dir):
+            return 0
+        
+        deleted = 0
+        with os.scandir(session_dir) as entries:
+            for entry in entries:
+                # Skip cachelib's file counter
+                if entry.name.startswith('__') or not entry.is_file():
+                    continue
+                try:
+                    if entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                        deleted += 1
+                except FileNotFoundError:
+                    continue
+                
+                # Yield between batches
+                if deleted and deleted % Config.REAPER_BATCH_SIZE == 0:
+                    time.sleep(0.01)
+        
+        self.session_files += deleted
+        return deleted
+    
+    def reap_session_store(self):
+        """Delete expired sessions from a server-side session store; returns sessions deleted"""
+        store = getattr(self.app.session_interface, 'store', None)
+        if store is None:
+            return 0
+        
+        deleted = 0
+        while True:
+            reaped = store.reap(Config.REAPER_BATCH_SIZE)
+            deleted += reaped
+            if reaped < Config.REAPER_BATCH_SIZE:
+                break
+        
+        self.stored_sessions += deleted
+        return deleted
+    
+    def run_once(self):
+        """Reap everything idle longer than its TTL; returns (carts, sessions) reaped"""
+        started = time.perf_counter()
+        
+        cart_cutoff = datetime.utcnow() - timedelta(seconds=Config.CART_IDLE_TTL_SECONDS)
+        sessions = 0
+        while True:
+            selected, reaped = self.reap_carts_batch(cart_cutoff)
+            sessions += reaped
+            if selected < Config.REAPER_BATCH_SIZE:
+                break
+        
+        files = self.reap_session_files(time.time() - Config.SESSION_IDLE_TTL_SECONDS)
+        files += self.reap_session_store()
+        
+        self.runs += 1
+        self.last_run_seconds = time.perf_counter() - started
+        if sessions or files:
+            print(f"Cart reaper: {sessions} carts, {files} expired sessions reclaimed in {self.last_run_seconds:.2f}s")
+        return sessions, files
+    
+    def stats(self):
+        """Totals since startup"""
+        return {
+            'runs': self.runs,
+            'cart_rows_reaped': self.cart_rows,
+            'cart_sessions_reaped': self.cart_sessions,
+            'session_files_reaped': self.session_files,
+            'stored_sessions_reaped': self.stored_sessions,
+            'last_run_seconds': round(self.last_run_seconds, 4)
+        }
+
+
+# Shared reaper instance
+cart_reaper = CartReaper()
+
+# ========================================
+# END OF ABANDONED CART REAPER
+# ========================================
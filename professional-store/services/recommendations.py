@@ -0,0 +1,228 @@
+# ========================================
+# JUSTIN E-COMMERCE - Co-Purchase Recommendations
+# ========================================
+#
+# Batch job building "customers also bought" lists from order_items.
+# Orders are streamed in order_id ranges into a sparse order x product
+# matrix B; the product x product co-occurrence C = B.T @ B is scored
+# as the cosine similarity of the two products' buyers and the top-k
+# per product are written to product_recommendations.
+#
+# Memory is bounded by RECOMMENDATION_MEMORY_MB: when the co-occurrence
+# rows of a block of products outgrow it, the block is split in half and
+# each half is built in its own pass over the orders.
+#
+# Needs numpy and scipy (optional dependencies). Reading recommendations
+# does not.
+
+import itertools
+import time
+from datetime import datetime
+from sqlalchemy import func, insert, text, bindparam
+from config import Config
+from models import db, Product, OrderItem, ProductRecommendation
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:
+    np = None
+    sparse = None
+
+ORDER_LINES = text(
+    'SELECT order_id, product_id FROM order_items '
+    'WHERE order_id >= :low AND order_id < :high'
+).bindparams(
+    bindparam('low', type_=db.Integer),
+    bindparam('high', type_=db.Integer)
+).columns(order_id=db.Integer, product_id=db.Integer)
+
+
+class OverBudget(Exception):
+    """A product block's co-occurrence rows outgrew the memory budget"""
+
+
+def available():
+    """True when numpy and scipy are installed"""
+    return np is not None
+
+# ============ MATRIX BUILDING ============
+
+def order_chunks(chunk_orders):
+    """Yield (order_ids, product_ids) arrays for consecutive order_id ranges"""
+    low, high = db.session.query(func.min(OrderItem.order_id), func.max(OrderItem.order_id)).one()
+    if low is None:
+        return
+    
+    for start in range(low, high + 1, chunk_orders):
+        rows = db.session.execute(ORDER_LINES, {'low': start, 'high': start + chunk_orders}).all()
+        if not rows:
+            continue
+        # fromiter over plain ints: np.array() on Row objects is very slow
+        lines = np.fromiter(itertools.chain.from_iterable(rows), dtype=np.int64, count=2 * len(rows)).reshape(-1, 2)
+        yield lines[:, 0], lines[:, 1]
+
+def incidence(order_ids, product_ids, catalog_ids):
+    """Binary order x product matrix for one chunk (columns index catalog_ids)"""
+    columns = np.searchsorted(catalog_ids, product_ids)
+    columns = np.minimum(columns, len(catalog_ids) - 1)
+    known = catalog_ids[columns] == product_ids  # Drop inactive or deleted products
+    
+    _, rows = np.unique(order_ids[known], return_inverse=True)
+    columns = columns[known]
+    matrix = sparse.csr_matrix(
+        (np.ones(len(columns), dtype=np.float32), (rows, columns)),
+        shape=(int(rows.max()) + 1 if len(rows) else 0, len(catalog_ids))
+    )
+    matrix.sum_duplicates()
+    matrix.data[:] = 1  # Same product twice in one order counts once
+    return matrix
+
+def matrix_bytes(matrix):
+    return matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+
+def co_occurrence(catalog_ids, start, stop, chunk_orders, budget_bytes):
+    """Co-occurrence rows [start, stop) and per-product order counts (one pass over the orders)"""
+    block = None
+    buyers = np.zeros(len(catalog_ids), dtype=np.float64)
+    
+    for order_ids, product_ids in order_chunks(chunk_orders):
+        orders = incidence(order_ids, product_ids, catalog_ids)
+        if orders.shape[0] == 0:
+            continue
+        buyers += np.asarray(orders.sum(axis=0)).ravel()
+        
+        rows = (orders[:, start:stop].T @ orders).tocsr()
+        block = rows if block is None else block + rows
+        if stop - start > 1 and matrix_bytes(block) > budget_bytes:
+            raise OverBudget()
+    
+    if block is None:
+        block = sparse.csr_matrix((stop - start, len(catalog_ids)), dtype=np.float32)
+    return block, buyers
+
+# ============ SCORING ============
+
+def top_k(block, start, buyers, k, min_co_purchases):
+    """Best k co-purchased products per row, vectorized.
+    
+    Returns (row, column, score, co_purchases, rank) arrays sorted by row, best first.
+    """
+    counts = block.data
+    rows = np.repeat(np.arange(start, start + block.shape[0]), np.diff(block.indptr))
+    columns = block.indices
+    
+    keep = (columns != rows) & (counts >= min_co_purchases)
+    rows, columns, counts = rows[keep], columns[keep], counts[keep]
+    scores = counts / np.sqrt(buyers[rows] * buyers[columns])
+    
+    # Sort by row, then score (desc), then product (asc) for stable ties
+    order = np.lexsort((columns, -scores, rows))
+    rows, columns, scores, counts = rows[order], columns[order], scores[order], counts[order]
+    
+    # Rank within each row = position minus the row's first position
+    if len(rows):
+        first = np.r_[0, np.flatnonzero(np.diff(rows)) + 1]
+        rank = np.arange(len(rows)) - np.repeat(first, np.diff(np.r_[first, len(rows)]))
+    else:
+        rank = np.zeros(0, dtype=np.int64)
+    best = rank < k
+    return rows[best], columns[best], scores[best], counts[best], rank[best]
+
+def store_block(catalog_ids, start, stop, result):
+    """Replace the stored recommendations of products [start, stop) in one transaction"""
+    rows, columns, scores, counts, ranks = result
+    
+    # Whole id range of the block, so inactive products in between lose their rows too
+    query = ProductRecommendation.query
+    if start > 0:
+        query = query.filter(ProductRecommendation.product_id >= int(catalog_ids[start]))
+    if stop < len(catalog_ids):
+        query = query.filter(ProductRecommendation.product_id < int(catalog_ids[stop]))
+    query.delete(synchronize_session=False)
+    
+    now = datetime.utcnow()
+    records = [
+        {
+            'product_id': product_id,
+            'rank': rank,
+            'recommended_id': recommended_id,
+            'score': score,
+            'co_purchases': co_purchases,
+            'updated_at': now
+        }
+        for product_id, rank, recommended_id, score, co_purchases in zip(
+            catalog_ids[rows].tolist(), ranks.tolist(), catalog_ids[columns].tolist(),
+            scores.tolist(), counts.astype(np.int64).tolist()
+        )
+    ]
+    for offset in range(0, len(records), 5000):
+        db.session.execute(insert(ProductRecommendation), records[offset:offset + 5000])
+    db.session.commit()
+    return len(records)
+
+# ============ JOB ============
+
+def build_recommendations(top=None, chunk_orders=None, memory_mb=None, min_co_purchases=None):
+    """Rebuild product_recommendations from all orders (inside app context); returns stats"""
+    if not available():
+        raise RuntimeError("Recommendations need numpy and scipy (pip install numpy scipy)")
+    
+    if top is None:
+        top = Config.RECOMMENDATIONS_PER_PRODUCT
+    if chunk_orders is None:
+        chunk_orders = Config.RECOMMENDATION_CHUNK_ORDERS
+    if memory_mb is None:
+        memory_mb = Config.RECOMMENDATION_MEMORY_MB
+    if min_co_purchases is None:
+        min_co_purchases = Config.RECOMMENDATION_MIN_CO_PURCHASES
+    
+    for name, value in (('top', top), ('chunk_orders', chunk_orders), ('memory_mb', memory_mb)):
+        if value <= 0:
+            raise ValueError(f"{name} must be positive, got {value}")
+    budget_bytes = memory_mb * 1024 * 1024
+    
+    started = time.perf_counter()
+    catalog_ids = np.array(
+        [pid for pid, in db.session.query(Product.id).filter(Product.active == True).order_by(Product.id)],
+        dtype=np.int64
+    )
+    stats = {'products': len(catalog_ids), 'passes': 0, 'recommendations': 0}
+    if not len(catalog_ids):
+        ProductRecommendation.query.delete(synchronize_session=False)
+        db.session.commit()
+        return stats
+    
+    # Blocks of product rows still to build; a block over budget is split in two
+    pending = [(0, len(catalog_ids))]
+    while pending:
+        start, stop = pending.pop(0)
+        stats['passes'] += 1
+        try:
+            block, buyers = co_occurrence(catalog_ids, start, stop, chunk_orders, budget_bytes)
+        except OverBudget:
+            middle = (start + stop) // 2
+            pending[:0] = [(start, middle), (middle, stop)]
+            continue
+        
+        result = top_k(block, start, buyers, top, min_co_purchases)
+        stats['recommendations'] += store_block(catalog_ids, start, stop, result)
+        del block
+    
+    stats['seconds'] = round(time.perf_counter() - started, 2)
+    return stats
+
+# ============ READS ============
+
+def get_also_bought(product_id, limit=4):
+    """Products bought together with this one, best first (empty before the first build)"""
+    return Product.query.join(
+        ProductRecommendation, ProductRecommendation.recommended_id == Product.id
+    ).filter(
+        ProductRecommendation.product_id == product_id,
+        Product.active == True
+    ).order_by(ProductRecommendation.rank).limit(limit).all()
+
+# ========================================
+# END OF CO-PURCHASE RECOMMENDATIONS
+# ========================================
@@ -0,0 +1,324 @@
+# ========================================
+# JUSTIN E-COMMERCE - Related Products
+# ========================================
+
+import heapq
+import math
+import time
+from datetime import datetime
+from sqlalchemy import insert, text, bindparam
+from config import Config
+from models import db, Product, RelatedProduct
+from services.background import BackgroundWorker
+from services.catalog_events import on_catalog_change
+from services.pagination import seek_after
+
+# Score = co-purchase signal + same-category bonus + price closeness (0..1)
+CO_PURCHASE_WEIGHT = 1.0
+SAME_CATEGORY_WEIGHT = 0.5
+PRICE_WEIGHT = 0.25
+
+# Product columns that change which items are related
+RELEVANT_FIELDS = frozenset(('category', 'price', 'active'))
+
+# Orders containing both this product and each other product
+CO_PURCHASES = text(
+    'SELECT other.product_id, COUNT(DISTINCT other.order_id) AS orders '
+    'FROM order_items AS mine '
+    'JOIN order_items AS other ON other.order_id = mine.order_id '
+    'WHERE mine.product_id = :product_id AND other.product_id != :product_id '
+    'GROUP BY other.product_id ORDER BY orders DESC, other.product_id LIMIT :limit'
+).bindparams(
+    bindparam('product_id', type_=db.Integer),
+    bindparam('limit', type_=db.Integer)
+)
+
+def relatedness(product, candidate, co_purchases):
+    """Score one candidate; product and candidate are (id, category, price)"""
+    score = CO_PURCHASE_WEIGHT * math.log1p(co_purchases)
+    if candidate[1] == product[1]:
+        score += SAME_CATEGORY_WEIGHT
+    score += PRICE_WEIGHT * min(product[2], candidate[2]) / max(product[2], candidate[2], 1)
+    return score
+
+def top_related(product, candidates, co_purchases, limit):
+    """Best candidates as (related_id, score, co_purchases), best first"""
+    scored = (
+        (relatedness(product, candidate, co_purchases.get(candidate[0], 0)), candidate[0])
+        for candidate in candidates if candidate[0] != product[0]
+    )
+    return [
+        (related_id, score, co_purchases.get(related_id, 0))
+        for score, related_id in heapq.nlargest(limit, scored)
+    ]
+
+def related_rows(product_id, ranked):
+    """related_products rows for one product's ranked list"""
+    now = datetime.utcnow()
+    return [
+        {
+            'product_id': product_id,
+            'rank': rank,
+            'related_id': related_id,
+            'score': score,
+            'co_purchases': co_purchases,
+            'updated_at': now
+        }
+        for rank, (related_id, score, co_purchases) in enumerate(ranked)
+    ]
+
+# ============ INCREMENTAL REFRESH ============
+
+def category_neighbors(product, limit):
+    """Active products in the same category closest in (price, id) order, on both sides"""
+    product_id, category, price = product
+    base = db.session.query(Product.id, Product.category, Product.price).filter(
+        Product.active == True,
+        Product.category == category
+    )
+    # The plain price bounds let SQLite range-scan the (active, category, price) index
+    cheaper = base.filter(
+        Product.price <= price,
+        seek_after([(Product.price, True), (Product.id, True)], [price, product_id])
+    ).order_by(Product.price.desc(), Product.id.desc()).limit(limit).all()
+    dearer = base.filter(
+        Product.price >= price,
+        seek_after([(Product.price, False), (Product.id, False)], [price, product_id])
+    ).order_by(Product.price, Product.id).limit(limit).all()
+    return [tuple(row) for row in cheaper + dearer]
+
+def compute_related(product_id, limit):
+    """Ranked related items for one product (empty if it is inactive or gone)"""
+    row = db.session.query(Product.id, Product.category, Product.price).filter(
+        Product.id == product_id, Product.active == True
+    ).first()
+    if row is None:
+        return []
+    product = tuple(row)
+    
+    co_purchases = dict(db.session.execute(CO_PURCHASES, {'product_id': product_id, 'limit': limit * 2}).all())
+    candidates = {candidate[0]: candidate for candidate in category_neighbors(product, limit)}
+    
+    missing = [pid for pid in co_purchases if pid not in candidates]
+    if missing:
+        for candidate in db.session.query(Product.id, Product.category, Product.price).filter(
+            Product.id.in_(missing), Product.active == True
+        ):
+            candidates[candidate[0]] = tuple(candidate)
+    
+    return top_related(product, candidates.values(), co_purchases, limit)
+
+def refresh_products(product_ids):
+    """Recompute the related lists of some products; returns the number refreshed"""
+    limit = Config.RELATED_PRODUCTS_PER_PRODUCT
+    product_ids = sorted(set(product_ids))
+    
+    rows = []
+    for product_id in product_ids:
+        rows.extend(related_rows(product_id, compute_related(product_id, limit)))
+    
+    RelatedProduct.query.filter(RelatedProduct.product_id.in_(product_ids)).delete(synchronize_session=False)
+    if rows:
+        db.session.execute(insert(RelatedProduct), rows)
+    db.session.commit()
+    return len(product_ids)
+
+def referrers(product_ids):
+    """Products whose related list shows any of product_ids"""
+    return {
+        product_id for product_id, in db.session.query(RelatedProduct.product_id).filter(
+            RelatedProduct.related_id.in_(list(product_ids))
+        ).distinct()
+    }
+
+# ============ FULL REBUILD ============
+
+def rebuild_all(chunk_size=2000):
+    """Recompute every product's related list.
+    
+    Co-purchases are read per product with the same bounded query as the
+    incremental path, so memory does not grow with the number of pairs.
+    """
+    limit = Config.RELATED_PRODUCTS_PER_PRODUCT
+    products = [tuple(row) for row in db.session.query(
+        Product.id, Product.category, Product.price
+    ).filter(Product.active == True).order_by(Product.category, Product.price, Product.id)]
+    by_id = {product[0]: product for product in products}
+    
+    # Sorted by (category, price): price neighbours are adjacent in the list
+    rows = []
+    refreshed = []
+    for index, product in enumerate(products):
+        window = [
+            candidate for candidate in products[max(0, index - limit):index + limit + 1]
+            if candidate[1] == product[1]
+        ]
+        bought_with = dict(db.session.execute(CO_PURCHASES, {'product_id': product[0], 'limit': limit * 2}).all())
+        candidates = {candidate[0]: candidate for candidate in window}
+        for other_id in bought_with:
+            if other_id in by_id:
+                candidates[other_id] = by_id[other_id]
+        
+        rows.extend(related_rows(product[0], top_related(product, candidates.values(), bought_with, limit)))
+        refreshed.append(product[0])
+        
+        if len(refreshed) >= chunk_size:
+            _replace_chunk(refreshed, rows)
+            rows, refreshed = [], []
+    
+    _replace_chunk(refreshed, rows)
+    
+    # Inactive and deleted products keep no list
+    stale = sorted({pid for pid, in db.session.query(RelatedProduct.product_id).distinct()} - set(by_id))
+    for start in range(0, len(stale), chunk_size):
+        _replace_chunk(stale[start:start + chunk_size], [])
+    return len(products)
+
+def _replace_chunk(product_ids, rows):
+    """Swap the stored lists of one chunk of products (one short transaction)"""
+    if not product_ids:
+        return
+    RelatedProduct.query.filter(RelatedProduct.product_id.in_(product_ids)).delete(synchronize_session=False)
+    if rows:
+        db.session.execute(insert(RelatedProduct), rows)
+    db.session.commit()
+
+# ============ READS ============
+
+def get_related_products(product, limit=4, exclude=()):
+    """Related items for a detail page, best first (falls back to same-category items).
+    
+    Products in exclude (already shown elsewhere on the page) are skipped.
+    """
+    exclude = list(exclude)
+    related = Product.query.join(
+        RelatedProduct, RelatedProduct.related_id == Product.id
+    ).filter(
+        RelatedProduct.product_id == product.id,
+        Product.active == True,
+        Product.id.notin_(exclude)
+    ).order_by(RelatedProduct.rank).limit(limit).all()
+    
+    if related:
+        return related
+    
+    # Not computed yet (new product, first start)
+    return Product.query.filter(
+        Product.category == product.category,
+        Product.id != product.id,
+        Product.id.notin_(exclude),
+        Product.active == True
+    ).limit(limit).all()
+
+# ============ BACKGROUND UPDATER ============
+
+class RelatedProductsUpdater(BackgroundWorker):
+    """Background thread keeping related lists current.
+    
+    Orders mark their products dirty (co-purchase counts changed).
+    Product changes mark the product, every product listing it and the
+    same-category price neighbours at its old and new positions (whose
+    candidate windows gained or lost it). A full rebuild runs when the
+    whole catalog may have changed.
+    """
+    
+    name = 'related-products-updater'
+    enabled_setting = 'RELATED_PRODUCTS_ENABLED'
+    
+    def __init__(self):
+        super().__init__()
+        self._dirty = set()
+        self._changed = set()
+        self._positions = set()
+        self._rebuild = False
+        self.refreshed = 0
+        self.rebuilds = 0
+    
+    def interval(self):
+        return Config.RELATED_REFRESH_SECONDS
+    
+    def mark_ordered(self, product_ids):
+        """Products were bought together"""
+        with self._lock:
+            self._dirty.update(product_ids)
+        self._wake.set()
+    
+    def mark_changed(self, product_ids, positions=()):
+        """Products changed category, price or availability.
+        
+        positions are the (id, category, price) spots they left or moved to.
+        """
+        with self._lock:
+            self._changed.update(product_ids)
+            self._positions.update(positions)
+        self._wake.set()
+    
+    def mark_all(self):
+        """Rebuild everything on the next run"""
+        with self._lock:
+            self._rebuild = True
+        self._wake.set()
+    
+    def run_once(self):
+        """Apply pending work (inside app context); returns products refreshed"""
+        with self._lock:
+            rebuild, self._rebuild = self._rebuild, False
+            dirty, self._dirty = self._dirty, set()
+            changed, self._changed = self._changed, set()
+            positions, self._positions = self._positions, set()
+        
+        if rebuild:
+            started = time.perf_counter()
+            count = rebuild_all()
+            self.rebuilds += 1
+            print(f"Related products rebuilt for {count} products in {time.perf_counter() - started:.2f}s")
+            return count
+        
+        if changed:
+            dirty |= changed | referrers(changed)
+        limit = Config.RELATED_PRODUCTS_PER_PRODUCT
+        for position in positions:
+            dirty.update(neighbor[0] for neighbor in category_neighbors(position, limit))
+        if not dirty:
+            return 0
+        
+        count = 0
+        dirty = sorted(dirty)
+        for start in range(0, len(dirty), 500):
+            count += refresh_products(dirty[start:start + 500])
+        self.refreshed += count
+        return count
+
+
+# Shared updater instance
+related_updater = RelatedProductsUpdater()
+
+@on_catalog_change
+def _mark_changed_products(changes):
+    """Product edits change which items are related (stock-only updates do not)"""
+    if changes is None:
+        related_updater.mark_all()
+        return
+    
+    relevant = [
+        change for change in changes
+        if change.action != 'update' or change.changed & RELEVANT_FIELDS
+    ]
+    if relevant:
+        related_updater.mark_changed(
+            {change.product_id for change in relevant},
+            {position for change in relevant for position in _positions(change)}
+        )
+
+def _positions(change):
+    """(id, category, price) spots in the catalog a changed product left or moved to"""
+    current = change.data or {}
+    previous = dict(current, **(change.previous or {}))
+    return {
+        (change.product_id, snapshot['category'], snapshot['price'])
+        for snapshot in (current, previous) if snapshot
+    }
+
+# ========================================
+# END OF RELATED PRODUCTS
+# ========================================
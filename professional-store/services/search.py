@@ -0,0 +1,130 @@
+# ========================================
+# JUSTIN E-COMMERCE - Product Search (SQLite FTS5)
+# ========================================
+
+import re
+from sqlalchemy import func, or_, select, literal_column, text, Float
+from sqlalchemy.exc import OperationalError
+from models import db, Product
+
+FTS_TABLE = 'products_fts'
+
+# Column weights for BM25 ranking: name, description, category
+BM25_WEIGHTS = (10.0, 1.0, 5.0)
+
+# External-content FTS5 table mirroring products, kept in sync by triggers
+# so bulk inserts and raw SQL updates are indexed as well
+FTS_SETUP = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, description, category,
+        content='products', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON products BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, description, category)
+        VALUES (new.id, new.name, new.description, new.category);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON products BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description, category)
+        VALUES ('delete', old.id, old.name, old.description, old.category);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF name, description, category ON products BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description, category)
+        VALUES ('delete', old.id, old.name, old.description, old.category);
+        INSERT INTO {FTS_TABLE}(rowid, name, description, category)
+        VALUES (new.id, new.name, new.description, new.category);
+    END"""
+]
+
+# Cached result of fts_available() (None = not checked yet)
+_fts_available = None
+
+def init_search_index():
+    """Create the FTS5 index and sync triggers (call inside app context)"""
+    global _fts_available
+    
+    if db.engine.dialect.name != 'sqlite':
+        _fts_available = False
+        return False
+    
+    try:
+        with db.engine.begin() as conn:
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {'name': FTS_TABLE}
+            ).first()
+            
+            for statement in FTS_SETUP:
+                conn.execute(text(statement))
+            
+            # Index products that existed before the FTS table
+            if not exists:
+                conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+                print("Full-text search index built")
+        
+        _fts_available = True
+    except OperationalError as e:
+        print(f"FTS5 not available - using LIKE search: {str(e)}")
+        _fts_available = False
+    
+    return _fts_available
+
+def fts_available():
+    """Check if the FTS5 index exists in the current database"""
+    global _fts_available
+    
+    if _fts_available is None:
+        if db.engine.dialect.name != 'sqlite':
+            _fts_available = False
+        else:
+            exists = db.session.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {'name': FTS_TABLE}
+            ).first()
+            _fts_available = exists is not None
+    
+    return _fts_available
+
+def build_match_query(search_text):
+    """Turn user search text into an FTS5 prefix query (e.g. 'wire hea' -> '"wire"* "hea"*')"""
+    tokens = re.findall(r'\w+', search_text.lower())
+    if not tokens:
+        return None
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+def filter_by_search(query, search_text):
+    """Filter a Product query by search text.
+    
+    Returns (query, rank) where rank is a BM25 column to order by
+    (lower is more relevant), or None when falling back to LIKE.
+    """
+    match = build_match_query(search_text)
+    
+    if match and fts_available():
+        fts = literal_column(FTS_TABLE)
+        matches = select(
+            literal_column('rowid').label('product_id'),
+            func.bm25(fts, *BM25_WEIGHTS, type_=Float).label('rank')
+        ).select_from(
+            text(FTS_TABLE)
+        ).where(
+            fts.op('MATCH')(match)
+        ).subquery('search_matches')
+        
+        query = query.join(matches, matches.c.product_id == Product.id)
+        return query, matches.c.rank
+    
+    # Fallback: unindexed substring match
+    search_term = f"%{search_text}%"
+    query = query.filter(
+        or_(
+            Product.name.ilike(search_term),
+            Product.description.ilike(search_term),
+            Product.category.ilike(search_term)
+        )
+    )
+    return query, None
+
+# ========================================
+# END OF PRODUCT SEARCH
+# ========================================
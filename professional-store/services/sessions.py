@@ -0,0 +1,354 @@
+# ========================================
+# JUSTIN E-COMMERCE - Session Backends
+# ========================================
+
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+
+# ============ SERIALIZATION ============
+
+def dumps(data):
+    """Compact JSON encoding of a session dict"""
+    return json.dumps(data, separators=(',', ':')).encode()
+
+def loads(payload):
+    """Decode a stored session (empty dict if unreadable)"""
+    try:
+        return json.loads(payload)
+    except (TypeError, ValueError):
+        return {}
+
+# ============ STORES ============
+
+class MemoryStore:
+    """In-process LRU store (one worker process only)"""
+    
+    def __init__(self, max_entries=100000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # sid -> (expires_at, payload)
+        self._lock = threading.Lock()
+    
+    def get(self, sid, ttl):
+        """Get the stored payload for a session id (or None) and extend its expiry to ttl from now"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(sid)
+            if entry is None:
+                return None
+            if entry[0] < now:
+                del self._entries[sid]
+                return None
+            self._entries[sid] = (now + ttl, entry[1])
+            self._entries.move_to_end(sid)
+            return entry[1]
+    
+    def set(self, sid, payload, ttl):
+        """Store a payload that expires after ttl seconds"""
+        with self._lock:
+            self._entries[sid] = (time.time() + ttl, payload)
+            self._entries.move_to_end(sid)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def delete(self, sid):
+        """Forget a session"""
+        with self._lock:
+            self._entries.pop(sid, None)
+    
+    def reap(self, limit):
+        """Drop up to limit expired sessions; returns the number dropped"""
+        now = time.time()
+        with self._lock:
+            expired = [sid for sid, (expires_at, _) in self._entries.items() if expires_at < now][:limit]
+            for sid in expired:
+                del self._entries[sid]
+        return len(expired)
+    
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteStore:
+    """Sessions in their own SQLite file, shared by every worker on the host.
+    
+    Kept out of the store database so session writes never wait on
+    catalog or order writes.
+    """
+    
+    SETUP = (
+        'CREATE TABLE IF NOT EXISTS sessions ('
+        ' id TEXT PRIMARY KEY,'
+        ' data BLOB NOT NULL,'
+        ' expires_at REAL NOT NULL'
+        ') WITHOUT ROWID',
+        'CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions(expires_at)',
+    )
+    
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            for statement in self.SETUP:
+                conn.execute(statement)
+    
+    def _connect(self):
+        """Open a WAL connection in autocommit mode"""
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+    
+    @property
+    def conn(self):
+        """One connection per thread"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+    
+    def get(self, sid, ttl):
+        """Get the stored payload for a session id (or None) and extend its expiry to ttl from now.
+        
+        The expiry is only rewritten once less than half the ttl is left,
+        so most reads stay reads.
+        """
+        now = time.time()
+        row = self.conn.execute(
+            'SELECT data, expires_at FROM sessions WHERE id = ? AND expires_at >= ?', (sid, now)
+        ).fetchone()
+        if row is None:
+            return None
+        if row[1] - now < ttl / 2:
+            self.conn.execute('UPDATE sessions SET expires_at = ? WHERE id = ?', (now + ttl, sid))
+        return row[0]
+    
+    def set(self, sid, payload, ttl):
+        """Store a payload that expires after ttl seconds"""
+        self.conn.execute(
+            'INSERT INTO sessions (id, data, expires_at) VALUES (?, ?, ?) '
+            'ON CONFLICT(id) DO UPDATE SET data = excluded.data, expires_at = excluded.expires_at',
+            (sid, payload, time.time() + ttl)
+        )
+    
+    def delete(self, sid):
+        """Forget a session"""
+        self.conn.execute('DELETE FROM sessions WHERE id = ?', (sid,))
+    
+    def reap(self, limit):
+        """Delete up to limit expired sessions; returns the number deleted"""
+        return self.conn.execute(
+            'DELETE FROM sessions WHERE id IN '
+            '(SELECT id FROM sessions WHERE expires_at < ? ORDER BY expires_at LIMIT ?)',
+            (time.time(), limit)
+        ).rowcount
+    
+    def __len__(self):
+        return self.conn.execute('SELECT COUNT(*) FROM sessions').fetchone()[0]
+
+
+class LocalRedis:
+    """In-process stand-in for the few redis-py calls RedisStore makes (tests, development)"""
+    
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        """Get the stored payload for a session id, or None"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.time():
+                self._data.pop(key, None)
+                return None
+            return entry[1]
+    
+    def getex(self, key, ex=None):
+        """Get a payload and reset its expiry (Redis GETEX)"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.time():
+                self._data.pop(key, None)
+                return None
+            if ex:
+                self._data[key] = (time.time() + ex, entry[1])
+            return entry[1]
+    
+    def set(self, key, value, ex=None):
+        """Store a payload that expires after ttl seconds"""
+        with self._lock:
+            self._data[key] = (time.time() + ex if ex else float('inf'), value)
+        return True
+    
+    def delete(self, key):
+        """Forget a session"""
+        with self._lock:
+            return 1 if self._data.pop(key, None) is not None else 0
+
+
+class RedisStore:
+    """Sessions in Redis (expiry handled by Redis TTLs)"""
+    
+    def __init__(self, client, prefix):
+        self.client = client
+        self.prefix = prefix
+    
+    @classmethod
+    def from_url(cls, url, prefix):
+        """Connect to url ('local://' uses the in-process stand-in)"""
+        if url.startswith('local://'):
+            return cls(LocalRedis(), prefix)
+        
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("SESSION_TYPE=redis needs the redis package (pip install redis)")
+        return cls(redis.Redis.from_url(url), prefix)
+    
+    def get(self, sid, ttl):
+        """Get the stored payload for a session id (or None) and reset its TTL (one GETEX)"""
+        return self.client.getex(self.prefix + sid, ex=int(ttl))
+    
+    def set(self, sid, payload, ttl):
+        """Store a payload that expires after ttl seconds"""
+        self.client.set(self.prefix + sid, payload, ex=int(ttl))
+    
+    def delete(self, sid):
+        """Forget a session"""
+        self.client.delete(self.prefix + sid)
+    
+    def reap(self, limit):
+        """Redis expires keys itself"""
+        return 0
+
+# ============ FLASK INTEGRATION ============
+
+class StoreSession(CallbackDict, SessionMixin):
+    """Session dict that remembers whether it changed"""
+    
+    def __init__(self, initial=None, sid=None, new=False):
+        def on_update(self):
+            self.modified = True
+            self.accessed = True
+        
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+        self.accessed = False
+    
+    def __getitem__(self, key):
+        self.accessed = True
+        return super().__getitem__(key)
+    
+    def __contains__(self, key):
+        self.accessed = True
+        return super().__contains__(key)
+    
+    def get(self, key, default=None):
+        self.accessed = True
+        return super().get(key, default)
+    
+    def setdefault(self, key, default=None):
+        self.accessed = True
+        return super().setdefault(key, default)
+
+
+class StoreSessionInterface(SessionInterface):
+    """Server-side sessions in a pluggable store.
+    
+    The cookie only carries a random session id. The store is read once
+    per request and written only when the session changed; reads slide
+    the expiry, so a visitor who keeps using an unchanged session (e.g.
+    a cart keyed by its id) is not logged out one TTL after the last write.
+    """
+    
+    def __init__(self, store, ttl):
+        self.store = store
+        self.ttl = ttl
+        self.reads = 0
+        self.writes = 0
+    
+    def open_session(self, app, request):
+        """Load the session named by the cookie (one store read)"""
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            payload = self.store.get(sid, self.ttl)
+            self.reads += 1
+            if payload is not None:
+                return StoreSession(loads(payload), sid=sid)
+        
+        # Unknown or expired id: start empty, the id is only issued when something is stored
+        return StoreSession(new=True)
+    
+    def save_session(self, app, session, response):
+        """Write the session only if it changed"""
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        
+        # Pages that read the session (cart count) differ per visitor
+        if session.accessed:
+            response.vary.add('Cookie')
+        
+        if not session:
+            if session.modified and session.sid:
+                self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+        
+        if not session.modified:
+            return
+        
+        if session.sid is None:
+            session.sid = secrets.token_urlsafe(32)
+        
+        self.store.set(session.sid, dumps(dict(session)), self.ttl)
+        self.writes += 1
+        
+        response.set_cookie(
+            name,
+            session.sid,
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app)
+        )
+
+
+def create_store(app):
+    """Create the store named by SESSION_TYPE"""
+    session_type = app.config['SESSION_TYPE']
+    
+    if session_type == 'memory':
+        return MemoryStore(app.config['SESSION_MEMORY_MAX_ENTRIES'])
+    if session_type == 'sqlite':
+        return SQLiteStore(app.config['SESSION_SQLITE_PATH'])
+    if session_type == 'redis':
+        return RedisStore.from_url(app.config['SESSION_REDIS_URL'], app.config['SESSION_KEY_PREFIX'])
+    raise ValueError(f"Unknown session type: {session_type}")
+
+def init_sessions(app):
+    """Install the configured session backend ('filesystem' keeps Flask-Session)"""
+    if app.config['SESSION_TYPE'] == 'filesystem':
+        from flask_session import Session
+        Session(app)
+        return None
+    
+    interface = StoreSessionInterface(create_store(app), app.config['SESSION_IDLE_TTL_SECONDS'])
+    app.session_interface = interface
+    return interface
+
+# ========================================
+# END OF SESSION BACKENDS
+# ========================================
@@ -0,0 +1,140 @@
+# ========================================
+# JUSTIN E-COMMERCE - Typeahead Index
+# ========================================
+
+from bisect import bisect_left, insort
+import re
+import threading
+import unicodedata
+from models import db, Product
+from services.catalog_events import on_catalog_change
+
+def normalize(value):
+    """Normalize text for prefix matching (lowercase, no accents or punctuation)"""
+    value = unicodedata.normalize('NFKD', value or '')
+    value = ''.join(ch for ch in value if not unicodedata.combining(ch))
+    return ' '.join(re.findall(r'\w+', value.lower()))
+
+def index_keys(name, category):
+    """Get index keys for a product: every word-start suffix of the name plus the category"""
+    words = normalize(name).split()
+    keys = {' '.join(words[i:]) for i in range(len(words))}
+    if category:
+        keys.add(normalize(category))
+    keys.discard('')
+    return keys
+
+
+class TypeaheadIndex:
+    """In-memory prefix index over product names and categories.
+    
+    Keys live in a sorted list of (key, product_id) tuples, so a prefix
+    lookup is one bisect plus a short forward scan.
+    """
+    
+    def __init__(self):
+        self._keys = []
+        self._entries = {}       # product_id -> suggestion dict
+        self._product_keys = {}  # product_id -> index keys
+        self._lock = threading.RLock()
+        self._built = False
+    
+    def build(self):
+        """(Re)build the index from active products"""
+        rows = db.session.query(
+            Product.id, Product.name, Product.price, Product.category
+        ).filter(Product.active == True).all()
+        
+        keys = []
+        entries = {}
+        product_keys = {}
+        for product_id, name, price, category in rows:
+            entries[product_id] = {'id': product_id, 'name': name, 'price': price}
+            product_keys[product_id] = index_keys(name, category)
+            keys.extend((key, product_id) for key in product_keys[product_id])
+        keys.sort()
+        
+        with self._lock:
+            self._keys = keys
+            self._entries = entries
+            self._product_keys = product_keys
+            self._built = True
+    
+    def ensure_built(self):
+        """Build the index on first use"""
+        if not self._built:
+            with self._lock:
+                if not self._built:
+                    self.build()
+    
+    def suggest(self, prefix, limit=8):
+        """Get up to limit products whose name words or category start with prefix"""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        
+        self.ensure_built()
+        
+        results = []
+        seen = set()
+        with self._lock:
+            keys = self._keys
+            position = bisect_left(keys, (prefix,))
+            while position < len(keys) and len(results) < limit:
+                key, product_id = keys[position]
+                if not key.startswith(prefix):
+                    break
+                if product_id not in seen:
+                    seen.add(product_id)
+                    results.append(self._entries[product_id])
+                position += 1
+        
+        return results
+    
+    def remove(self, product_id):
+        """Remove a product from the index"""
+        with self._lock:
+            for key in self._product_keys.pop(product_id, ()):
+                position = bisect_left(self._keys, (key, product_id))
+                if position < len(self._keys) and self._keys[position] == (key, product_id):
+                    del self._keys[position]
+            self._entries.pop(product_id, None)
+    
+    def upsert(self, product_id, name, price, category):
+        """Add or replace a product in the index"""
+        with self._lock:
+            self.remove(product_id)
+            self._entries[product_id] = {'id': product_id, 'name': name, 'price': price}
+            self._product_keys[product_id] = index_keys(name, category)
+            for key in self._product_keys[product_id]:
+                insort(self._keys, (key, product_id))
+    
+    def apply_changes(self, changes):
+        """Apply committed product changes incrementally"""
+        with self._lock:
+            if not self._built:
+                return
+            
+            if changes is None:
+                self._built = False
+                return
+            
+            for change in changes:
+                if change.action == 'delete' or not change.data['active']:
+                    self.remove(change.product_id)
+                elif change.changed & {'name', 'price', 'category', 'active'}:
+                    data = change.data
+                    self.upsert(change.product_id, data['name'], data['price'], data['category'])
+
+
+# Shared index instance
+typeahead_index = TypeaheadIndex()
+
+@on_catalog_change
+def _update_typeahead(changes):
+    """Keep the typeahead index in sync with the catalog"""
+    typeahead_index.apply_changes(changes)
+
+# ========================================
+# END OF TYPEAHEAD INDEX
+# ========================================
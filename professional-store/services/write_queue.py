@@ -0,0 +1,195 @@
+# ========================================
+# JUSTIN E-COMMERCE - Group-Commit Write Queue
+# ========================================
+
+import queue
+import threading
+import time
+from models import db
+
+class WriteRejected(Exception):
+    """Raised by a write intent to refuse the write (e.g. insufficient stock).
+    
+    Intents must raise it before changing anything, so the rest of the
+    batch can still be committed.
+    """
+    
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+class WriteTimeout(Exception):
+    """Raised by submit() when the writer did not answer in time.
+    
+    applied is False when the intent was withdrawn before it ran, and
+    None when it was already running (it may still commit).
+    """
+    
+    def __init__(self, message, applied=None, status=503):
+        super().__init__(message)
+        self.message = message
+        self.applied = applied
+        self.status = status
+
+
+class WriteIntent:
+    """One queued write and the request thread waiting for it"""
+    
+    def __init__(self, fn):
+        self.fn = fn
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+        self.state = 'queued'  # -> 'running' (taken by the writer) or 'abandoned' (submitter gave up)
+        self._lock = threading.Lock()
+    
+    def claim(self):
+        """Writer side: take the intent unless its submitter gave up"""
+        with self._lock:
+            if self.state == 'queued':
+                self.state = 'running'
+            return self.state == 'running'
+    
+    def abandon(self):
+        """Submitter side: withdraw the intent unless the writer took it"""
+        with self._lock:
+            if self.state == 'queued':
+                self.state = 'abandoned'
+            return self.state == 'abandoned'
+    
+    def finish(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.done.set()
+
+
+class GroupCommitWriter:
+    """Single writer thread that commits queued write intents in groups.
+    
+    An intent is a function taking the writer's session and returning a
+    plain result (not ORM objects). Requests block until the group
+    containing their intent is committed. With coalescing disabled,
+    intents run inline on the request's session and commit immediately.
+    """
+    
+    def __init__(self):
+        self.app = None
+        self.enabled = False
+        self.batch_size = 32
+        self.batch_wait = 0.002
+        self.timeout = 10
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.intents = 0
+    
+    def init_app(self, app):
+        """Read settings from app config"""
+        self.app = app
+        self.enabled = app.config.get('WRITE_COALESCING_ENABLED', False)
+        self.batch_size = app.config.get('WRITE_BATCH_SIZE', 32)
+        self.batch_wait = app.config.get('WRITE_BATCH_WAIT_MS', 2) / 1000
+        self.timeout = app.config.get('WRITE_TIMEOUT_SECONDS', 10)
+    
+    def submit(self, fn):
+        """Run a write intent and return its result once committed"""
+        if not self.enabled:
+            return self._run_inline(fn)
+        
+        self._ensure_started()
+        intent = WriteIntent(fn)
+        self._queue.put(intent)
+        
+        if not intent.done.wait(self.timeout):
+            if intent.abandon():
+                raise WriteTimeout('The store is busy, please try again', applied=False)
+            raise WriteTimeout('The request timed out and may still complete - please check before retrying')
+        if intent.error is not None:
+            raise intent.error
+        return intent.result
+    
+    def depth(self):
+        """Number of write intents waiting for the writer thread"""
+        return self._queue.qsize()
+    
+    def _run_inline(self, fn):
+        """Run an intent on the current session and commit it"""
+        try:
+            result = fn(db.session)
+            db.session.commit()
+            return result
+        except Exception:
+            db.session.rollback()
+            raise
+    
+    def _ensure_started(self):
+        """Start the writer thread on first use (after any worker fork)"""
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(
+                        target=self._run, name='group-commit-writer', daemon=True
+                    )
+                    self._thread.start()
+    
+    def _next_batch(self):
+        """Block for one intent, then gather more for up to batch_wait"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.batch_wait
+        
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        
+        return batch
+    
+    def _run(self):
+        """Writer loop"""
+        while True:
+            # Intents whose submitter timed out are dropped, never run
+            batch = [intent for intent in self._next_batch() if intent.claim()]
+            if not batch:
+                continue
+            with self.app.app_context():
+                self._commit_batch(batch)
+            self.batches += 1
+            self.intents += len(batch)
+    
+    def _commit_batch(self, batch):
+        """Apply a batch in one transaction; replay one by one if it fails"""
+        results = []
+        try:
+            for intent in batch:
+                try:
+                    results.append((intent, intent.fn(db.session), None))
+                except WriteRejected as e:
+                    results.append((intent, None, e))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            for intent in batch:
+                try:
+                    intent.finish(result=self._run_inline(intent.fn))
+                except Exception as e:
+                    intent.finish(error=e)
+            return
+        
+        for intent, result, error in results:
+            intent.finish(result=result, error=error)
+
+
+# Shared writer instance
+write_queue = GroupCommitWriter()
+
+# ========================================
+# END OF GROUP-COMMIT WRITE QUEUE
+# ========================================
@@ -6,19 +6,22 @@
 document.addEventListener('DOMContentLoaded', function() {
     console.log('🚀 JUSTIN E-COMMERCE - Professional Store Loaded');
     
-    // Initialize cart count
-    updateCartCount();
+    // Cart count is rendered into the page; it is only refreshed after cart changes
     
     // Add smooth scroll behavior
     initSmoothScroll();
     
     // Initialize any animations
     initAnimations();
+    
+    // Load more catalog pages on demand
+    initLoadMore();
 });
 
 // ============ CART COUNT ============
+// Re-read the count from the server (answered with 304 while unchanged)
 function updateCartCount() {
-    fetch('/api/cart/count')
+    fetch('/api/cart/count', { cache: 'no-cache' })
         .then(response => response.json())
         .then(data => {
             const cartCountElement = document.getElementById('cartCount');
@@ -37,6 +40,40 @@ function updateCartCount() {
         .catch(error => console.error('Error updating cart count:', error));
 }
 
+// ============ LOAD MORE (CATALOG PAGINATION) ============
+function initLoadMore() {
+    const button = document.getElementById('loadMoreButton');
+    const grid = document.getElementById('productsGrid');
+    if (!button || !grid) {
+        return;
+    }
+    
+    button.addEventListener('click', function() {
+        setLoading(button, true);
+        
+        fetch(button.dataset.nextUrl)
+            .then(response => response.json())
+            .then(data => {
+                if (data.error) {
+                    throw new Error(data.error);
+                }
+                
+                grid.insertAdjacentHTML('beforeend', data.html);
+                
+                if (data.next_url) {
+                    button.dataset.nextUrl = data.next_url;
+                    setLoading(button, false);
+                } else {
+                    button.parentElement.remove();
+                }
+            })
+            .catch(error => {
+                setLoading(button, false);
+                handleError(error, 'Error loading more products');
+            });
+    });
+}
+
 // ============ SMOOTH SCROLLING ============
 function initSmoothScroll() {
     document.querySelectorAll('a[href^="#"]').forEach(anchor => {